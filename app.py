@@ -6,10 +6,14 @@ Your data looks clean. It isn't.
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import time, csv, os, re, math
+import csv, io, os, re, math, atexit, logging
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from importlib.util import find_spec
 
 st.set_page_config(
     page_title="DataQuality.ai — Is your data really clean?",
@@ -26,9 +30,16 @@ from semantic import (detect_entity, detect_domain, estimate_monetary_impact,
 # ─────────────────────────────────────────────────────────────────────────────
 # CSS — Dark tactical dashboard
 # ─────────────────────────────────────────────────────────────────────────────
-st.markdown("""
+@st.cache_data
+def _app_css() -> str:
+    """Global stylesheet. Built once per process; still emitted every run,
+    since Streamlit drops elements a rerun doesn't re-send. Fonts come in via
+    <link> (not @import) so they load alongside the rules instead of ahead of them."""
+    return """
+<link rel="preconnect" href="https://fonts.googleapis.com">
+<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+<link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800;900&family=JetBrains+Mono:wght@400;500;600&display=swap">
 <style>
-@import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800;900&family=JetBrains+Mono:wght@400;500;600&display=swap');
 
 *, *::before, *::after { box-sizing: border-box; }
 html, body, [class*="css"] { font-family: 'Inter', sans-serif !important; }
@@ -177,6 +188,10 @@ div[data-testid="stFileUploaderDropzone"] p {
     border-radius: 10px; padding: 10px 16px;
 }
 .step-pill.active { border-color: #58A6FF; background: #0A1628; }
+
+/* ── Lock-overlay feature pills ── */
+.lock-pill { background: #21262D; border: 1px solid #30363D; border-radius: 999px; padding: 5px 16px; font-size: 12px; color: #8B949E; }
+.lock-pill.hot { background: #1C1000; border-color: #F85149; color: #F85149; font-weight: 700; }
 .step-num {
     width: 22px; height: 22px; border-radius: 50%;
     display: flex; align-items: center; justify-content: center;
@@ -345,13 +360,17 @@ div[data-testid="stFileUploaderDropzone"] p {
     .step-pill { padding: 8px 12px !important; }
 }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+
+st.markdown(_app_css(), unsafe_allow_html=True)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Helpers
 # ─────────────────────────────────────────────────────────────────────────────
 
+@lru_cache(maxsize=128)
 def score_color(s):
     if s is None: return "#6E7681"
     if s >= 85:   return "#3FB950"
@@ -365,6 +384,50 @@ SEV = {
     "high":     {"bg": "#2d1500", "border": "#F0883E", "text": "#F0883E", "badge_bg": "#F0883E", "badge_fg": "#010409"},
     "medium":   {"bg": "#2a1d00", "border": "#E3B341", "text": "#E3B341", "badge_bg": "#E3B341", "badge_fg": "#010409"},
 }
+# Finding-card severity badges — constant chrome, formatted once
+_SEV_BADGE = {
+    sev: f'<span class="sev-badge" style="background:{s["badge_bg"]};color:{s["badge_fg"]}">{sev.upper()}</span>'
+    for sev, s in SEV.items()
+}
+
+# str.translate runs the whole substitution in C — cheaper than html.escape
+_HTML_ESCAPE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;",
+                              '"': "&quot;", "'": "&#39;"})
+
+def _esc(v) -> str:
+    """Escape a data- or user-derived value for unsafe_allow_html blocks."""
+    return str(v).translate(_HTML_ESCAPE)
+
+def _show_errors(errs: list):
+    """All messages in one st.error box — a bullet list when there are several."""
+    if len(errs) == 1:
+        st.error(errs[0])
+    elif errs:
+        st.error("\n".join(f"- {e}" for e in errs))
+
+def _rec_escaped(rec: dict) -> dict:
+    """HTML-safe copy of a recommendation's text fields (file, key and stage
+    names are interpolated into them). Built once per analysis."""
+    e = {k: _esc(v) for k, v in rec.items() if isinstance(v, str)}
+    e["full_steps"] = [_esc(step) for step in rec.get("full_steps", [])]
+    return e
+
+# Column-name classifiers shared by the preview, profiler and per-file scores
+_MONEY_RE   = re.compile(r"amount|price|cost|revenue|salary|fee|total|value", re.IGNORECASE)
+_DATE_RE    = re.compile(r"date|time|created|updated|timestamp", re.IGNORECASE)
+_PK_RE      = re.compile(r"^id$|_id$|_key$", re.IGNORECASE)
+_CSV_EXT_RE = re.compile(r"\.csv$", re.IGNORECASE)
+
+def _column_kinds(dfs: dict) -> dict:
+    """Classify every column once per analysis → {file: {"money", "date", "numeric"}}."""
+    return {
+        fname: {
+            "money":   {c for c in df.columns if _MONEY_RE.search(c)},
+            "date":    {c for c in df.columns if _DATE_RE.search(c)},
+            "numeric": [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])],
+        }
+        for fname, df in dfs.items()
+    }
 
 DIMS = [
     ("completeness", "Completeness",  "Non-null rate"),
@@ -375,19 +438,30 @@ DIMS = [
 ]
 
 
-def _dl_png_btn(fig: go.Figure, filename: str, label: str = "⬇ Download PNG"):
-    """Render a small download button that exports a Plotly figure as PNG."""
+@lru_cache(maxsize=1)
+def _png_export_ok() -> bool:
+    """Whether Plotly can export PNGs here. Probed once per process: kaleido
+    may be installed yet unusable (v1 also needs a Chrome to drive)."""
+    if find_spec("kaleido") is None:
+        return False
     try:
-        img_bytes = fig.to_image(format="png", scale=2)
-        st.download_button(
-            label=label,
-            data=img_bytes,
-            file_name=filename,
-            mime="image/png",
-            key=f"dl_{filename}_{id(fig)}",
-        )
+        go.Figure().to_image(format="png")
+        return True
     except Exception:
-        pass  # kaleido not available — silently skip
+        return False
+
+def _dl_png_btn(fig: go.Figure, filename: str, label: str = "⬇ Download PNG"):
+    """Render a small download button that exports a Plotly figure as PNG.
+    The export runs on click, not on every rerun; skipped when exports fail."""
+    if not _png_export_ok():
+        return
+    st.download_button(
+        label=label,
+        data=lambda: fig.to_image(format="png", scale=2),
+        file_name=filename,
+        mime="image/png",
+        key=f"dl_{filename}",
+    )
 
 
 
@@ -544,8 +618,6 @@ def render_db_connector():
     if st.button(f"🔌  Connect to {db_name.split()[1]}",
                  type="primary", use_container_width=False,
                  key="db_connect_btn"):
-        with st.spinner(f"Connecting to {db_name.split()[1]}..."):
-            time.sleep(2.2)
         st.markdown(f"""
         <div style="background:linear-gradient(135deg,#161B22,#0D1117);
                     border:1px solid {color};border-radius:10px;
@@ -613,37 +685,45 @@ def _render_progress(placeholder, pct: int, current: str, done_steps: list):
     """, unsafe_allow_html=True)
 
 
+# Hand-tuned node layouts for small graphs; larger ones fall back to a ring
+_FLOW_POSITIONS = {
+    1: [(0, 0)],
+    2: [(-2.5, 0), (2.5, 0)],
+    3: [(-3, 0), (3, 0), (0, -2.5)],
+    4: [(-3, 1), (3, 1), (-3, -1), (3, -1)],
+    5: [(-3, 1.5), (3, 1.5), (0, 0), (-3, -1.5), (3, -1.5)],
+}
+
+def _flow_positions(n: int) -> list:
+    if n in _FLOW_POSITIONS:
+        return _FLOW_POSITIONS[n]
+    angles = np.linspace(0, 2 * np.pi, n, endpoint=False)
+    return list(zip((3 * np.cos(angles)).tolist(), (2 * np.sin(angles)).tolist()))
+
+
 def make_flow_map(dfs, joins, orphan_result, gap_result) -> go.Figure:
     names = list(dfs.keys())
-    n = len(names)
-
-    POSITIONS = {
-        1: [(0, 0)],
-        2: [(-2.5, 0), (2.5, 0)],
-        3: [(-3, 0), (3, 0), (0, -2.5)],
-        4: [(-3, 1), (3, 1), (-3, -1), (3, -1)],
-        5: [(-3, 1.5), (3, 1.5), (0, 0), (-3, -1.5), (3, -1.5)],
-    }
-    pos = {names[i]: POSITIONS[n][i] for i in range(n)}
+    pos   = dict(zip(names, _flow_positions(len(names))))
+    esc   = {name: _esc(name) for name in names}   # Plotly text is HTML-ish markup
 
-    # Build issue lookup
+    # Build issue lookup — findings carry "A → B", so key them by file pair directly
+    join_pairs   = {tuple(sorted([j["file_a"], j["file_b"]])) for j in joins}
     issue_lookup = {}
     for f in orphan_result.get("findings", []):
-        key = (f["file_a"] if hasattr(f, "file_a") else None, None)
-        for j in joins:
-            if j["file_a"] in f["direction"] and j["file_b"] in f["direction"]:
-                pair = tuple(sorted([j["file_a"], j["file_b"]]))
-                if pair not in issue_lookup or f["pct_of_source"] > issue_lookup[pair]["pct"]:
-                    issue_lookup[pair] = {"pct": f["pct_of_source"], "count": f["orphan_count"]}
+        pair = tuple(sorted(f["direction"].split(" → ", 1)))
+        if pair not in join_pairs:
+            continue
+        if pair not in issue_lookup or f["pct_of_source"] > issue_lookup[pair]["pct"]:
+            issue_lookup[pair] = {"pct": f["pct_of_source"], "count": f["orphan_count"]}
 
     for f in gap_result.get("findings", []):
         pair = tuple(sorted([f["stage_from"], f["stage_to"]]))
-        if pair not in issue_lookup or f["pct_of_upstream"] > issue_lookup.get(pair, {}).get("pct", 0):
+        if pair not in issue_lookup or f["pct_of_upstream"] > issue_lookup[pair]["pct"]:
             issue_lookup[pair] = {"pct": f["pct_of_upstream"], "count": f["missing_count"]}
 
-    fig = go.Figure()
-
-    # Draw edges
+    # Edges are grouped by colour — one line trace and one label trace per
+    # colour, with None-separated segments, instead of two traces per edge
+    edges = {}   # color -> {"x", "y", "lx", "ly", "lbl"}
     drawn_pairs = set()
     for j in joins:
         fa, fb = j["file_a"], j["file_b"]
@@ -654,47 +734,58 @@ def make_flow_map(dfs, joins, orphan_result, gap_result) -> go.Figure:
 
         x0, y0 = pos[fa]
         x1, y1 = pos[fb]
-        mx, my = (x0+x1)/2, (y0+y1)/2
 
         issue = issue_lookup.get(pair)
         if issue:
             pct = issue["pct"]
             color = "#F85149" if pct > 20 else "#F0883E" if pct > 5 else "#E3B341"
             lbl = f"✗ {issue['count']:,} orphans ({pct}%)"
-            width = 2
         else:
             color = "#3FB950"
             lbl = f"✓ matched"
-            width = 2
 
-        fig.add_trace(go.Scatter(
-            x=[x0, x1, None], y=[y0, y1, None],
+        e = edges.setdefault(color, {"x": [], "y": [], "lx": [], "ly": [], "lbl": []})
+        e["x"]  += [x0, x1, None]
+        e["y"]  += [y0, y1, None]
+        e["lx"].append((x0+x1)/2)
+        e["ly"].append((y0+y1)/2)
+        e["lbl"].append(f"<b>{lbl}</b>")
+
+    fig = go.Figure()
+    # Edge lines go through WebGL; labels and nodes stay SVG because
+    # Scattergl text drops the <b>/<br> markup they rely on
+    for color, e in edges.items():
+        fig.add_trace(go.Scattergl(
+            x=e["x"], y=e["y"],
             mode="lines",
-            line=dict(color=color, width=width),
+            line=dict(color=color, width=2),
             showlegend=False, hoverinfo="skip",
         ))
+    for color, e in edges.items():
         fig.add_trace(go.Scatter(
-            x=[mx], y=[my], mode="text",
-            text=[f"<b>{lbl}</b>"],
+            x=e["lx"], y=e["ly"], mode="text",
+            text=e["lbl"],
             textfont=dict(size=10, color=color, family="JetBrains Mono"),
             showlegend=False, hoverinfo="skip",
         ))
 
-    # Draw nodes
-    for name, (x, y) in pos.items():
-        df   = dfs[name]
-        rows = len(df)
-        cols = len(df.columns)
-        fig.add_trace(go.Scatter(
-            x=[x], y=[y], mode="markers+text",
-            marker=dict(size=70, color="#161B22",
-                        line=dict(color="#58A6FF", width=2)),
-            text=[f"<b>{name}</b><br><span style='font-size:10px'>{rows:,} rows</span>"],
-            textposition="middle center",
-            textfont=dict(size=12, color="#E6EDF3", family="Inter"),
-            showlegend=False,
-            hovertemplate=f"<b>{name}</b><br>{rows:,} rows · {cols} cols<extra></extra>",
-        ))
+    # Nodes — a single trace with per-point text and hover
+    node_names = list(pos)
+    fig.add_trace(go.Scatter(
+        x=[pos[name][0] for name in node_names],
+        y=[pos[name][1] for name in node_names],
+        mode="markers+text",
+        marker=dict(size=70, color="#161B22",
+                    line=dict(color="#58A6FF", width=2)),
+        text=[f"<b>{esc[name]}</b><br><span style='font-size:10px'>{len(dfs[name]):,} rows</span>"
+              for name in node_names],
+        textposition="middle center",
+        textfont=dict(size=12, color="#E6EDF3", family="Inter"),
+        showlegend=False,
+        hovertemplate=[f"<b>{esc[name]}</b><br>{len(dfs[name]):,} rows · "
+                       f"{len(dfs[name].columns)} cols<extra></extra>"
+                       for name in node_names],
+    ))
 
     fig.update_layout(
         paper_bgcolor="#0D1117", plot_bgcolor="#0D1117",
@@ -702,21 +793,12 @@ def make_flow_map(dfs, joins, orphan_result, gap_result) -> go.Figure:
         yaxis=dict(showgrid=False, zeroline=False, showticklabels=False, range=[-4, 3]),
         height=280, margin=dict(t=10, b=10, l=10, r=10),
         font={"family": "Inter"},
+        uirevision="flow-map",
     )
     return fig
 
 
-def render_dim_bars(scores, weights):
-    html = []
-    for key, label, sub in DIMS:
-        val = scores.get(key)
-        w   = weights.get(key, 0)
-        c   = score_color(val)
-        lbl, _ = score_label(val)
-        pct    = val if val is not None else 0
-        vstr   = f"{val:.0f}" if val is not None else "N/A"
-        wstr   = f"{int(w*100)}%"
-        html.append(f"""
+_DIM_ROW = """
         <div class="dim-row">
           <div class="dim-header">
             <div>
@@ -728,65 +810,177 @@ def render_dim_bars(scores, weights):
           <div class="dim-track">
             <div class="dim-fill" style="width:{pct}%;background:{c}"></div>
           </div>
-        </div>""")
-    st.markdown("".join(html), unsafe_allow_html=True)
+        </div>"""
+
+
+def _dim_row_ctx(key, label, sub, scores, weights) -> dict:
+    val    = scores.get(key)
+    lbl, c = score_label(val)     # same thresholds/colours as score_color
+    return {
+        "label": label,
+        "sub":   sub,
+        "wstr":  f"{int(weights.get(key, 0)*100)}%",
+        "c":     c,
+        "lbl":   lbl,
+        "pct":   val if val is not None else 0,
+        "vstr":  f"{val:.0f}" if val is not None else "N/A",
+    }
+
+
+def render_dim_bars(scores, weights):
+    st.markdown("".join(_DIM_ROW.format_map(_dim_row_ctx(key, label, sub, scores, weights))
+                        for key, label, sub in DIMS),
+                unsafe_allow_html=True)
+
+
+@lru_cache(maxsize=512)
+def _ex_chips_html(values: tuple) -> str:
+    """Example-value chips; findings on one analysis re-render the same values every rerun."""
+    chips = "".join(f'<span class="ex-code">{_esc(v)}</span>' for v in values)
+    return f'<div class="finding-examples">{chips}</div>'
 
 
-def render_finding(title, metric, severity, detail, examples=None):
+def _finding_html(title, metric, severity, detail, examples=None) -> str:
     s   = SEV.get(severity, SEV["medium"])
-    ex  = ""
-    if examples:
-        chips = "".join(f'<span class="ex-code">{v}</span>' for v in examples[:5])
-        ex = f'<div class="finding-examples">{chips}</div>'
-    sev_label = severity.upper()
-    st.markdown(f"""
+    ex  = _ex_chips_html(tuple(examples[:5])) if examples else ""
+    return f"""
     <div class="finding finding-{severity}">
-      <span class="sev-badge" style="background:{s['badge_bg']};color:{s['badge_fg']}">{sev_label}</span>
+      {_SEV_BADGE.get(severity, _SEV_BADGE["medium"])}
       <div class="finding-title">{title}</div>
       <div class="finding-headline" style="color:{s['text']}">{metric}</div>
       <div class="finding-detail">{detail}</div>
       {ex}
-    </div>""", unsafe_allow_html=True)
+    </div>"""
 
 
-def render_insight(icon, title, text):
-    st.markdown(f"""
+def _insight_html(icon, title, text) -> str:
+    return f"""
     <div class="insight-card">
       <div class="insight-title">{icon}&nbsp;&nbsp;{title}</div>
       <div class="insight-text">{text}</div>
-    </div>""", unsafe_allow_html=True)
+    </div>"""
 
 
-def render_rec_teaser(rec):
-    s = SEV.get(rec["severity"], SEV["medium"])
-    st.markdown(f"""
+def _critical_findings_html(orphan_findings, dupe_findings, gap_findings) -> str:
+    """Finding cards for the Critical Findings section, built once per analysis."""
+    cards = []
+    for f in orphan_findings:
+        pct = f["pct_of_source"]
+        sev = "critical" if pct > 25 else ("high" if pct > 8 else "medium")
+        cards.append(_finding_html(
+            title=f"Orphan records — {_esc(f['direction'])}",
+            metric=f"{f['orphan_count']:,} records ({pct}%) invisible in reports",
+            severity=sev,
+            detail=f"Key: <code style='color:#79C0FF;font-family:JetBrains Mono'>{_esc(f['key'])}</code> · "
+                   "These records vanish from every JOIN, aggregation, and report built on this relationship.",
+            examples=f["example_values"],
+        ))
+
+    for f in dupe_findings:
+        sev = "critical" if f["duplicate_count"] > 10 else "high"
+        names_ex = [e.get("name") or e.get("value_a","") for e in f["examples"][:3]]
+        cards.append(_finding_html(
+            title=f"Entity duplicates — '{_esc(f['file'])}' ({_esc(f['type'])})",
+            metric=f"{f['duplicate_count']} duplicate entities",
+            severity=sev,
+            detail="Same real-world entity under multiple IDs. "
+                   "Every count, segment, and KPI built on this table is wrong.",
+            examples=names_ex,
+        ))
+
+    for f in gap_findings:
+        pct = f["pct_of_upstream"]
+        sev = "critical" if pct > 20 else ("high" if pct > 5 else "medium")
+        cards.append(_finding_html(
+            title=f"Process gap — {_esc(f['stage_from'])} → {_esc(f['stage_to'])}",
+            metric=f"{f['missing_count']:,} records ({pct}%) stalled in the pipeline",
+            severity=sev,
+            detail="Records started the process but never completed the next stage. "
+                   "SLA violations, broken audit trail, and invisible workflow failures.",
+            examples=f["example_ids"],
+        ))
+    return "".join(cards)
+
+
+# Business-impact box templates — parsed once, filled per item
+_IMPACT_VALUE_ROW = (
+    '<div class="impact-row"><span style="color:#8B949E">{label}</span>'
+    '<span style="color:#F85149;font-weight:700;font-family:\'JetBrains Mono\',monospace">'
+    '~${value:,.0f}</span></div>'
+)
+_IMPACT_COUNT_ROW = (
+    '<div class="impact-row"><span style="color:#8B949E">{label}</span>'
+    '<span style="color:#F85149;font-weight:700">{count:,} records</span></div>'
+)
+_IMPACT_VALUE_BOX = """
+<div class="impact-box">
+  <div style="font-size:12px;font-weight:700;text-transform:uppercase;letter-spacing:1px;color:#6E7681;margin-bottom:6px">
+    Identified risk
+  </div>
+  <div class="impact-total">~${total:,.0f}</div>
+  <div style="font-size:12px;color:#6E7681;margin-bottom:20px">
+    estimated revenue / pipeline at risk · based on avg transaction value ${avg_value:,.0f}
+  </div>
+  {rows}
+</div>"""
+_IMPACT_COUNT_BOX = """
+<div class="impact-box">
+  <div style="font-size:12px;font-weight:700;text-transform:uppercase;letter-spacing:1px;color:#6E7681;margin-bottom:16px">
+    Records at risk (no monetary column detected for $ estimate)
+  </div>
+  {rows}
+</div>"""
+
+
+def _impact_box_html(impact: dict) -> str:
+    """Business-impact box — $ estimate when a monetary column exists, else record counts."""
+    if impact.get("has_monetary") and impact.get("total"):
+        rows = "".join(
+            _IMPACT_VALUE_ROW.format(label=_esc(it["label"]), value=it["value"])
+            for it in impact["items"] if it.get("value")
+        )
+        return _IMPACT_VALUE_BOX.format(total=impact["total"],
+                                        avg_value=impact["avg_value"], rows=rows)
+    rows = "".join(
+        _IMPACT_COUNT_ROW.format(label=_esc(it["label"]), count=it["count"])
+        for it in impact["items"]
+    )
+    return _IMPACT_COUNT_BOX.format(rows=rows)
+
+
+def _rec_teaser_html(rec) -> str:
+    s = rec["_sev_style"]
+    e = rec["_esc"]
+    return f"""
     <div class="rec-teaser">
       <div style="display:flex;gap:14px;align-items:flex-start">
         <span style="font-size:22px;line-height:1.3">{rec['icon']}</span>
         <div style="flex:1">
-          <div style="font-size:14px;font-weight:700;color:#E6EDF3">{rec['title']}</div>
-          <div style="font-size:13px;color:#6E7681;margin-top:4px;font-family:'JetBrains Mono',monospace">{rec['teaser_metric']}</div>
-          <div style="font-size:13px;color:{s['text']};margin-top:6px;font-weight:600">⚠ {rec['teaser_impact']}</div>
+          <div style="font-size:14px;font-weight:700;color:#E6EDF3">{e['title']}</div>
+          <div style="font-size:13px;color:#6E7681;margin-top:4px;font-family:'JetBrains Mono',monospace">{e['teaser_metric']}</div>
+          <div style="font-size:13px;color:{s['text']};margin-top:6px;font-weight:600">⚠ {e['teaser_impact']}</div>
           <div style="margin-top:10px;font-size:12px;color:#484F58;font-style:italic">
             🔒 Step-by-step fix · SQL queries · Prevention strategy — unlock below
           </div>
         </div>
       </div>
-    </div>""", unsafe_allow_html=True)
+    </div>"""
 
 
-def render_rec_full(rec):
-    s     = SEV.get(rec["severity"], SEV["medium"])
-    steps = "".join(f"<li style='margin-bottom:8px;color:#C9D1D9'>{step}</li>" for step in rec["full_steps"])
-    st.markdown(f"""
+def _rec_full_html(rec) -> str:
+    """Unlocked recommendation card. Built once per analysis in run_analysis."""
+    s     = rec["_sev_style"]
+    e     = rec["_esc"]
+    steps = "".join(f"<li style='margin-bottom:8px;color:#C9D1D9'>{step}</li>" for step in e["full_steps"])
+    return f"""
     <div class="rec-full" style="background:{s['bg']};border-color:{s['border']}">
       <div style="display:flex;align-items:center;gap:12px;margin-bottom:14px">
         <span style="font-size:22px">{rec['icon']}</span>
-        <span style="font-size:15px;font-weight:700;color:#E6EDF3">{rec['title']}</span>
+        <span style="font-size:15px;font-weight:700;color:#E6EDF3">{e['title']}</span>
         <span class="sev-badge" style="background:{s['badge_bg']};color:{s['badge_fg']};margin-left:auto">{rec['severity'].upper()}</span>
       </div>
       <p style="font-size:13px;color:#8B949E;margin:0 0 14px;line-height:1.6">
-        <strong style="color:#C9D1D9">Root cause:</strong> {rec['full_root_cause']}
+        <strong style="color:#C9D1D9">Root cause:</strong> {e['full_root_cause']}
       </p>
       <p style="font-size:12px;font-weight:700;color:{s['text']};text-transform:uppercase;letter-spacing:1px;margin:0 0 8px">
         Step-by-step fix
@@ -794,10 +988,10 @@ def render_rec_full(rec):
       <ol style="font-size:13px;margin:0 0 16px;padding-left:18px;line-height:1.8">{steps}</ol>
       <div style="display:flex;flex-wrap:wrap;gap:20px;font-size:12px;color:#6E7681;
                   border-top:1px solid #21262D;padding-top:12px">
-        <span>⏱ <strong style="color:#8B949E">Effort:</strong> {rec['effort']}</span>
-        <span>🛡 <strong style="color:#8B949E">Prevention:</strong> {rec['prevention']}</span>
+        <span>⏱ <strong style="color:#8B949E">Effort:</strong> {e['effort']}</span>
+        <span>🛡 <strong style="color:#8B949E">Prevention:</strong> {e['prevention']}</span>
       </div>
-    </div>""", unsafe_allow_html=True)
+    </div>"""
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -805,15 +999,67 @@ def render_rec_full(rec):
 # ─────────────────────────────────────────────────────────────────────────────
 
 LEADS_FILE = os.path.join(os.path.dirname(__file__), "leads.csv")
+_EMAIL_RE  = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+_log       = logging.getLogger(__name__)
+_ROLE_OPTIONS = (
+    "Select…", "Data Engineer", "Data Analyst",
+    "Analytics / BI Manager", "Data Governance Lead",
+    "CTO / VP Engineering", "Business Owner / Manager", "Other",
+)
+
+def _open_leads_csv(path: str) -> tuple:
+    """Append handle + DictWriter for the leads file; writes the header if new."""
+    exists = os.path.isfile(path)
+    f = open(path, "a", newline="", encoding="utf-8")
+    w = csv.DictWriter(f, fieldnames=["timestamp","name","company","email","role"])
+    if not exists:
+        w.writeheader()
+    return f, w
+
 
 def save_lead(name, company, email, role):
-    exists = os.path.isfile(LEADS_FILE)
-    with open(LEADS_FILE, "a", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=["timestamp","name","company","email","role"])
-        if not exists:
-            w.writeheader()
-        w.writerow({"timestamp": datetime.now().isoformat(timespec="seconds"),
-                    "name": name, "company": company, "email": email, "role": role})
+    _, fh = _lead_writer()
+    if not fh or not os.path.exists(LEADS_FILE):   # first lead, or file rotated/deleted
+        if fh:
+            fh["f"].close()
+        fh["f"], fh["w"] = _open_leads_csv(LEADS_FILE)
+    fh["w"].writerow({"timestamp": datetime.now().isoformat(timespec="seconds"),
+                      "name": name, "company": company, "email": email, "role": role})
+    fh["f"].flush()
+
+
+@st.cache_resource
+def _lead_writer() -> tuple:
+    """Single background writer shared across reruns and sessions, plus the
+    leads-file handle only it touches (module globals would be reset by every
+    rerun). One worker keeps appends serialized; one atexit hook drains the
+    queue before closing the file, so no lead lands on a closed handle."""
+    pool, fh = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lead-writer"), {}
+    def _shutdown():
+        pool.shutdown(wait=True)
+        if fh:
+            fh["f"].close()
+    atexit.register(_shutdown)
+    return pool, fh
+
+
+def _log_lead_failure(fut):
+    """Done-callback for a queued lead — the writer thread has no UI to report to."""
+    if fut.exception() is not None:
+        _log.error("Saving lead failed", exc_info=fut.exception())
+
+
+def _queue_lead(name, company, email, role):
+    """Hand a lead to the writer unless this session already saved, or is
+    saving, that email (double-submits, or re-entering it after a new
+    diagnostic). A write that failed doesn't count, so re-submitting retries it."""
+    h    = hash(email.lower())
+    prev = st.session_state.get("_lead_save")
+    if prev and prev[0] == h and not (prev[1].done() and prev[1].exception()):
+        return
+    fut = _lead_writer()[0].submit(save_lead, name, company, email, role)
+    fut.add_done_callback(_log_lead_failure)
+    st.session_state["_lead_save"] = (h, fut)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -824,38 +1070,54 @@ def save_lead(name, company, email, role):
 # Data preview helpers
 # ─────────────────────────────────────────────────────────────────────────────
 
+# Cell colours by issue priority (lower number wins when a cell has several)
+_ISSUE_STYLE = {
+    p: f"background-color:{bg};color:{fg};font-weight:600"
+    for p, (bg, fg) in {
+        1: ("#3d0f0f", "#F85149"),   # null / whitespace
+        2: ("#2d1500", "#F0883E"),   # orphan key
+        3: ("#2a1d00", "#E3B341"),   # invalid value
+        4: ("#0d1525", "#79C0FF"),   # outlier
+        5: ("#0d1a2d", "#58A6FF"),   # duplicate row
+        6: ("#1a0d00", "#c97a50"),   # orphan row
+    }.items()
+}
+
 def _analyze_preview_issues(preview: pd.DataFrame, name: str,
-                             dfs: dict, joins: list) -> tuple:
+                             dfs: dict, joins: list, kinds: dict) -> tuple:
     """
     Comprehensive per-cell issue detection.
     Returns (color_map, tooltip_map, counts).
     Priority: 1=null > 2=orphan-key > 3=invalid > 4=outlier > 5=dup > 6=orphan-row
     """
-    cell_data = {}   # (idx, col) -> [(priority, bg, fg, tip)]
+    cell_data = {}   # (idx, col) -> [(priority, tip)]
+
+    def add(idx, col, priority, tip):
+        cell_data.setdefault((idx, col), []).append((priority, tip))
 
-    def add(idx, col, priority, bg, fg, tip):
-        key = (idx, col)
-        cell_data.setdefault(key, []).append((priority, bg, fg, tip))
+    cols = preview.columns
 
     # ── 1. Null / whitespace ─────────────────────────────────────────────────
-    null_count = 0
-    for idx in preview.index:
-        for col in preview.columns:
-            val = preview.loc[idx, col]
-            if pd.isna(val):
-                null_count += 1
-                add(idx, col, 1, "#3d0f0f", "#F85149",
-                    "🔴 Missing value (null) — excluded from all aggregations, "
-                    "averages, counts, and reports. Trace back to the source system "
-                    "or ETL pipeline to find where this value is lost.")
-            elif isinstance(val, str) and len(val) > 0 and val.strip() == "":
-                null_count += 1
-                add(idx, col, 1, "#3d0f0f", "#F85149",
-                    "🔴 Whitespace-only string — appears non-empty but contains only "
-                    "spaces or tabs. Will fail equality checks and cause join mismatches.")
+    null_mask  = preview.isna().to_numpy()
+    blank_mask = np.zeros_like(null_mask)
+    for j, col in enumerate(cols):
+        s = preview[col]
+        if s.dtype == object or pd.api.types.is_string_dtype(s):
+            text = s.where(s.notna(), "").astype(str)
+            blank_mask[:, j] = ((text.str.len() > 0) & (text.str.strip() == "")).to_numpy(dtype=bool)
+    null_count = int(null_mask.sum() + blank_mask.sum())
+    for r, c in zip(*np.nonzero(null_mask)):
+        add(preview.index[r], cols[c], 1,
+            "🔴 Missing value (null) — excluded from all aggregations, "
+            "averages, counts, and reports. Trace back to the source system "
+            "or ETL pipeline to find where this value is lost.")
+    for r, c in zip(*np.nonzero(blank_mask)):
+        add(preview.index[r], cols[c], 1,
+            "🔴 Whitespace-only string — appears non-empty but contains only "
+            "spaces or tabs. Will fail equality checks and cause join mismatches.")
 
     # ── 2. Orphan records ─────────────────────────────────────────────────────
-    orphan_rows = set()
+    orphan_rows = np.zeros(len(preview), dtype=bool)   # any join left this row unmatched
     for j in joins:
         if j["file_a"] == name:
             col_self = j.get("col_a", j["key"])
@@ -867,121 +1129,129 @@ def _analyze_preview_issues(preview: pd.DataFrame, name: str,
             continue
         if col_self not in preview.columns or other_name not in dfs:
             continue
-        other_vals = set(dfs[other_name][col_other].dropna().astype(str))
-        for idx in preview.index:
-            val = preview.loc[idx, col_self]
-            if pd.isna(val):
-                continue
-            if str(val) not in other_vals:
-                orphan_rows.add(idx)
-                # Key column — high contrast
-                add(idx, col_self, 2, "#2d1500", "#F0883E",
-                    f"🟠 Orphan key — '{val}' has no matching {col_other} "
-                    f"in '{other_name}'. This row is invisible in every JOIN, "
-                    f"aggregation, and report built on this relationship.")
-                # Rest of the row — lighter tint
-                for other_col in preview.columns:
-                    if other_col != col_self:
-                        add(idx, other_col, 6, "#1a0d00", "#c97a50",
-                            f"🟠 Orphan row — key '{col_self}' = '{val}' "
-                            f"has no match in '{other_name}'. "
-                            f"This entire row is excluded from joined analyses.")
+        # One hashtable lookup per join; only unmatched rows reach the Python loop.
+        # Matching non-object dtypes (or two integer widths, after the load-time
+        # downcast) compare natively — no per-value str copies.
+        keys  = preview[col_self]
+        other = dfs[other_name][col_other].dropna()
+        if (keys.dtype == other.dtype and keys.dtype != object) or (
+                pd.api.types.is_integer_dtype(keys) and pd.api.types.is_integer_dtype(other)):
+            orphan = keys.notna() & ~keys.isin(other.unique())
+        else:
+            orphan = keys.notna() & ~keys.astype(str).isin(other.astype(str).unique())
+        orphan_rows |= orphan.to_numpy()
+        for idx, val in keys[orphan].items():
+            # Key column — high contrast
+            add(idx, col_self, 2,
+                f"🟠 Orphan key — '{val}' has no matching {col_other} "
+                f"in '{other_name}'. This row is invisible in every JOIN, "
+                f"aggregation, and report built on this relationship.")
+            # Rest of the row — lighter tint
+            for other_col in preview.columns:
+                if other_col != col_self:
+                    add(idx, other_col, 6,
+                        f"🟠 Orphan row — key '{col_self}' = '{val}' "
+                        f"has no match in '{other_name}'. "
+                        f"This entire row is excluded from joined analyses.")
 
     # ── 3. Duplicate rows ─────────────────────────────────────────────────────
-    dup_mask = preview.duplicated(keep=False)
-    dup_rows_set = set(preview.index[dup_mask])
+    # One vectorised 64-bit hash per row; identical rows share a hash
+    row_hash = pd.util.hash_pandas_object(preview, index=False)
+    dup_mask = row_hash.duplicated(keep=False)
+    dup_rows = preview.index[dup_mask.to_numpy()]
     dup_groups: dict = {}
-    for idx in dup_rows_set:
-        key = tuple(preview.loc[idx].fillna("__∅__"))
-        dup_groups.setdefault(key, []).append(idx)
+    for idx, h in row_hash[dup_mask].items():
+        dup_groups.setdefault(h, []).append(idx)
     for group_idxs in dup_groups.values():
         for idx in group_idxs:
             others = [r + 1 for r in group_idxs if r != idx]
             others_str = ", ".join(str(r) for r in others[:4])
             for col in preview.columns:
-                add(idx, col, 5, "#0d1a2d", "#58A6FF",
+                add(idx, col, 5,
                     f"🔵 Duplicate row — identical record also at row {others_str}. "
                     f"Entity counts, totals, and KPIs are inflated. "
                     f"Add a UNIQUE constraint and deduplicate at ingestion.")
 
     # ── 4. Per-column validity ────────────────────────────────────────────────
     validity_count = 0
+    now = pd.Timestamp.now(tz="UTC")
     for col in preview.columns:
         s = preview[col]
 
-        # Negative monetary values
-        is_money = bool(re.search(
-            r"(amount|price|cost|revenue|salary|fee|total|value)", col, re.IGNORECASE))
-        if is_money and pd.api.types.is_numeric_dtype(s):
-            neg_idx = s[s < 0].index
-            validity_count += len(neg_idx)
-            for idx in neg_idx:
-                add(idx, col, 3, "#2a1d00", "#E3B341",
-                    f"⚠ Negative monetary value ({s[idx]:,.2f}) — monetary columns "
-                    f"should be ≥ 0. Could be an uncoded refund, credit note, "
-                    f"or a sign-convention mismatch between systems.")
+        # Negative monetary values — min() settles clean columns without a mask.
+        # An all-null column has no min (NaN, or NA on nullable dtypes).
+        if col in kinds["money"] and col in kinds["numeric"]:
+            s_min = s.min()
+            if pd.notna(s_min) and s_min < 0:
+                neg_idx = s[s < 0].index
+                validity_count += len(neg_idx)
+                for idx in neg_idx:
+                    add(idx, col, 3,
+                        f"⚠ Negative monetary value ({s[idx]:,.2f}) — monetary columns "
+                        f"should be ≥ 0. Could be an uncoded refund, credit note, "
+                        f"or a sign-convention mismatch between systems.")
 
         # Date issues
-        if re.search(r"(date|time|created|updated|timestamp)", col, re.IGNORECASE):
+        if col in kinds["date"]:
             try:
                 parsed = pd.to_datetime(s, errors="coerce", utc=True)
-                now = pd.Timestamp.now(tz="UTC")
-                # Future dates
-                for idx in parsed[parsed > now].index:
-                    days_ahead = (parsed[idx] - now).days
-                    validity_count += 1
-                    add(idx, col, 3, "#2a1d00", "#E3B341",
-                        f"⚠ Future date ({s[idx]}) — {days_ahead:,} day"
-                        f"{'s' if days_ahead != 1 else ''} ahead of today. "
-                        f"Verify: intentional scheduled event, or a year/month "
-                        f"transposition error?")
-                # Unparseable non-null values
-                bad_idx = parsed[parsed.isna() & s.notna()].index
-                validity_count += len(bad_idx)
-                for idx in bad_idx:
-                    add(idx, col, 3, "#2a1d00", "#E3B341",
-                        f"⚠ Invalid date format '{s[idx]}' — cannot be parsed. "
-                        f"Standardize to ISO 8601 (YYYY-MM-DD) for reliable "
-                        f"sorting, filtering, and time-series operations.")
+                # Future dates — skipped when even the latest date is in the past
+                latest = parsed.max()
+                if pd.notna(latest) and latest > now:
+                    for idx in parsed[parsed > now].index:
+                        days_ahead = (parsed[idx] - now).days
+                        validity_count += 1
+                        add(idx, col, 3,
+                            f"⚠ Future date ({s[idx]}) — {days_ahead:,} day"
+                            f"{'s' if days_ahead != 1 else ''} ahead of today. "
+                            f"Verify: intentional scheduled event, or a year/month "
+                            f"transposition error?")
+                # Unparseable non-null values — only possible if parsing added NaTs
+                if parsed.isna().sum() > s.isna().sum():
+                    bad_idx = parsed[parsed.isna() & s.notna()].index
+                    validity_count += len(bad_idx)
+                    for idx in bad_idx:
+                        add(idx, col, 3,
+                            f"⚠ Invalid date format '{s[idx]}' — cannot be parsed. "
+                            f"Standardize to ISO 8601 (YYYY-MM-DD) for reliable "
+                            f"sorting, filtering, and time-series operations.")
             except Exception:
                 pass
 
         # Numeric outliers (3× IQR — extreme values only)
-        if pd.api.types.is_numeric_dtype(s):
+        if col in kinds["numeric"]:
             non_null = s.dropna()
             if len(non_null) > 10:
                 q25, q75 = non_null.quantile(0.25), non_null.quantile(0.75)
                 iqr = q75 - q25
                 if iqr > 0:
                     lo, hi = q25 - 3 * iqr, q75 + 3 * iqr
-                    for idx in preview.index:
-                        val = s[idx]
-                        if pd.notna(val) and (val < lo or val > hi):
-                            direction = "low" if val < lo else "high"
-                            validity_count += 1
-                            add(idx, col, 4, "#0d1525", "#79C0FF",
-                                f"◈ Statistical outlier ({val:,.2f}) — extreme {direction} "
-                                f"value. Normal range: {lo:,.1f} → {hi:,.1f} (3× IQR). "
-                                f"Verify: unit mismatch, manual entry error, "
-                                f"or genuine edge case?")
+                    outliers = non_null[(non_null < lo) | (non_null > hi)]
+                    validity_count += len(outliers)
+                    for idx, val in outliers.items():
+                        direction = "low" if val < lo else "high"
+                        add(idx, col, 4,
+                            f"◈ Statistical outlier ({val:,.2f}) — extreme {direction} "
+                            f"value. Normal range: {lo:,.1f} → {hi:,.1f} (3× IQR). "
+                            f"Verify: unit mismatch, manual entry error, "
+                            f"or genuine edge case?")
 
     # ── Build output maps ─────────────────────────────────────────────────────
     color_map, tooltip_map = {}, {}
     for (idx, col), issues in cell_data.items():
         issues.sort(key=lambda x: x[0])   # highest priority wins for color
-        _, bg, fg, _ = issues[0]
-        color_map[(idx, col)] = f"background-color:{bg};color:{fg};font-weight:600"
+        color_map[(idx, col)] = _ISSUE_STYLE[issues[0][0]]
         seen, tips = [], []
-        for _, _, _, tip in issues:
+        for _, tip in issues:
             if tip not in seen:
                 seen.append(tip)
                 tips.append(tip)
-        tooltip_map[(idx, col)] = "<br><br>".join(tips[:2])
+        tooltip_map[(idx, col)] = "<br><br>".join(_esc(t) for t in tips[:2])
 
     counts = {
         "nulls":       null_count,
-        "orphan_rows": len(orphan_rows),
-        "dup_rows":    len(dup_rows_set),
+        "orphan_rows": int(orphan_rows.sum()),
+        "dup_rows":    len(dup_rows),
         "validity":    validity_count,
     }
     return color_map, tooltip_map, counts
@@ -993,20 +1263,26 @@ def _build_preview_html(df: pd.DataFrame, color_map: dict,
     cols = list(df.columns)
 
     # Header
-    th = "".join(f"<th>{c}</th>" for c in cols)
+    th = "".join(f"<th>{_esc(c)}</th>" for c in cols)
     rows_html = [f"<thead><tr><th>#</th>{th}</tr></thead><tbody>"]
 
-    for idx in df.index:
+    # Cell text for the whole frame in column-wise vector ops, not per df.loc
+    shown = {}
+    for col in cols:
+        text = df[col].astype(str)
+        text = text.where(text.str.len() <= 45, text.str[:45] + "…")
+        text = text.str.translate(_HTML_ESCAPE)   # escaped after truncating
+        shown[col] = text.mask(df[col].isna(), "∅").tolist()
+
+    for pos, idx in enumerate(df.index):
         row_cells = [f'<td style="color:#484F58;font-size:10px;'
                      f'border-right:1px solid #30363D">{idx + 1}</td>']
         for col in cols:
-            raw = df.loc[idx, col]
-            display = "∅" if pd.isna(raw) else str(raw)[:45] + ("…" if len(str(raw)) > 45 else "")
+            display = shown[col][pos]
             style = color_map.get((idx, col), "")
             tip   = tooltip_map.get((idx, col), "")
 
             if style or tip:
-                safe_tip = tip.replace('"', "&quot;").replace("<br><br>", " | ")
                 row_cells.append(
                     f'<td class="dq-c" style="{style}">'
                     f'<span class="dq-v">{display}</span>'
@@ -1022,7 +1298,17 @@ def _build_preview_html(df: pd.DataFrame, color_map: dict,
     return f"<table class='dq-tbl'>{''.join(rows_html)}</table>"
 
 
-def render_data_preview(dfs: dict, joins: list):
+@st.cache_data(show_spinner=False)
+def _preview_table(name: str, dfs: dict, joins: list, kinds: dict) -> tuple:
+    """Annotated first-100-rows table for one file → (table_html, counts, rows_shown).
+    Cached so widget reruns don't redo the per-cell scan."""
+    preview = dfs[name].head(100).reset_index(drop=True)
+    color_map, tooltip_map, counts = _analyze_preview_issues(preview, name, dfs, joins, kinds)
+    counts["flagged"] = len(color_map)
+    return _build_preview_html(preview, color_map, tooltip_map), counts, len(preview)
+
+
+def render_data_preview(dfs: dict, joins: list, col_kinds: dict):
     """Render annotated data preview — HTML table with per-cell hover tooltips."""
     st.markdown('<hr class="dq-divider">', unsafe_allow_html=True)
     st.markdown("""
@@ -1077,13 +1363,11 @@ def render_data_preview(dfs: dict, joins: list):
 
     for tab, (name, df) in zip(tabs, dfs.items()):
         with tab:
-            preview = df.head(100).reset_index(drop=True)
-            color_map, tooltip_map, counts = _analyze_preview_issues(
-                preview, name, dfs, joins)
+            table_html, counts, shown = _preview_table(name, dfs, joins, col_kinds[name])
 
             # Metrics row
             m1, m2, m3, m4, m5 = st.columns(5)
-            m1.metric("Rows shown",    f"{len(preview):,} / {len(df):,}")
+            m1.metric("Rows shown",    f"{shown:,} / {len(df):,}")
             m2.metric("Missing cells", counts["nulls"],
                       delta=f"-{counts['nulls']}"       if counts["nulls"]       else None, delta_color="inverse")
             m3.metric("Orphan rows",   counts["orphan_rows"],
@@ -1094,11 +1378,10 @@ def render_data_preview(dfs: dict, joins: list):
                       delta=f"-{counts['validity']}"    if counts["validity"]    else None, delta_color="inverse")
 
             # HTML table
-            table_html = _build_preview_html(preview, color_map, tooltip_map)
             st.markdown(f'<div class="dq-wrap">{table_html}</div>',
                         unsafe_allow_html=True)
 
-            if not color_map:
+            if not counts["flagged"]:
                 st.success("✅ No issues detected in the visible rows of this file.")
 
 
@@ -1110,6 +1393,7 @@ def _unused_profile_columns(df: pd.DataFrame) -> list:  # kept for reference, no
     """Generate a rich profile for every column."""
     col_types = classify_columns(df)
     profiles  = []
+    now       = pd.Timestamp.now()
 
     for col in df.columns:
         sem   = col_types.get(col, "other")
@@ -1144,7 +1428,7 @@ def _unused_profile_columns(df: pd.DataFrame) -> list:  # kept for reference, no
                     if _iqr > 0:
                         p["outliers"] = int(((non_null < _q25 - 1.5*_iqr) |
                                              (non_null > _q75 + 1.5*_iqr)).sum())
-        elif re.search(r"(date|time|created|updated|timestamp)", col, re.IGNORECASE):
+        elif _DATE_RE.search(col):
             p["dtype"] = "datetime"
             try:
                 parsed = pd.to_datetime(s, errors="coerce").dropna()
@@ -1152,7 +1436,7 @@ def _unused_profile_columns(df: pd.DataFrame) -> list:  # kept for reference, no
                     p["date_min"]   = str(parsed.min().date())
                     p["date_max"]   = str(parsed.max().date())
                     p["range_days"] = (parsed.max() - parsed.min()).days
-                    p["future"]     = int((parsed > pd.Timestamp.now()).sum())
+                    p["future"]     = int((parsed > now).sum())
             except Exception:
                 pass
         else:
@@ -1190,10 +1474,8 @@ def render_score_reveal(R: dict):
     bench     = details.get("benchmark", "")
     urgency   = details.get("urgency", "")
 
-    n_orphans  = sum(f["orphan_count"]    for f in R["orphans"].get("findings", []))
-    n_dupes    = sum(f["duplicate_count"] for f in R["dupes"].get("findings", []))
-    n_gaps     = sum(f["missing_count"]   for f in R["gaps"].get("findings", []))
-    rows_total = sum(len(df) for df in R["dfs"].values())
+    n_orphans, n_dupes, n_gaps = R["issue_totals"]
+    rows_total = R["rows_total"]
 
     # ── Header banner ─────────────────────────────────────────────────────────
     st.markdown(f"""
@@ -1226,8 +1508,9 @@ def render_score_reveal(R: dict):
             f'<div style="background:#0D1117;border-left:1px solid {gc};'
             f'border-right:none;border-bottom:none;padding:8px 0 0 0">',
             unsafe_allow_html=True)
+        # Static readout — staticPlot skips Plotly's hover/zoom event wiring
         st.plotly_chart(make_speedometer(overall), use_container_width=True,
-                        config={"displayModeBar": False})
+                        config={"staticPlot": True, "displayModeBar": False})
         # Zone labels
         st.markdown(f"""
         <div style="display:flex;justify-content:space-between;
@@ -1267,8 +1550,7 @@ def render_score_reveal(R: dict):
         for key, label, _ in DIMS:
             val  = scores.get(key)
             w    = weights.get(key, 0)
-            c    = score_color(val)
-            ld, _ = score_label(val)
+            ld, c = score_label(val)
             pct  = val if val is not None else 0
             vs   = f"{val:.0f}" if val is not None else "N/A"
             ws   = f"{int(w*100)}%"
@@ -1328,13 +1610,9 @@ def render_score_reveal(R: dict):
 # Distribution histograms
 # ─────────────────────────────────────────────────────────────────────────────
 
-def render_distributions(dfs: dict):
+def render_distributions(dfs: dict, col_kinds: dict):
     """Show Plotly histograms for all numeric columns, grouped by file."""
-    has_numeric = any(
-        pd.api.types.is_numeric_dtype(df[col])
-        for df in dfs.values() for col in df.columns
-    )
-    if not has_numeric:
+    if not any(k["numeric"] for k in col_kinds.values()):
         return
 
     st.markdown('<hr class="dq-divider">', unsafe_allow_html=True)
@@ -1351,10 +1629,8 @@ def render_distributions(dfs: dict):
 
     for tab, (fname, df) in zip(tabs, dfs.items()):
         with tab:
-            num_cols = [
-                c for c in df.columns
-                if pd.api.types.is_numeric_dtype(df[c]) and df[c].dropna().nunique() > 1
-            ]
+            kinds    = col_kinds[fname]
+            num_cols = [c for c in kinds["numeric"] if df[c].dropna().nunique() > 1]
             if not num_cols:
                 st.info("No numeric columns with varied data in this file.")
                 continue
@@ -1382,8 +1658,7 @@ def render_distributions(dfs: dict):
                 col_pos = i % cols_per_row + 1
                 data = df[col].dropna()
 
-                is_money = bool(re.search(
-                    r"(amount|price|cost|revenue|salary|fee|total|value)", col, re.IGNORECASE))
+                is_money = col in kinds["money"]
                 has_neg = is_money and bool((data < 0).any())
 
                 q25, q75 = data.quantile(0.25), data.quantile(0.75)
@@ -1450,12 +1725,16 @@ def render_distributions(dfs: dict):
 # Quality heatmap (per-file × per-dimension)
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _per_file_scores(dfs: dict, score_data: dict) -> dict:
+@st.cache_data(show_spinner=False)
+def _per_file_scores(dfs: dict, score_data: dict, col_kinds: dict) -> dict:
     """Compute approximate per-file scores for Completeness, Uniqueness, Validity, Timeliness."""
     details = score_data["details"]
-    result = {}
+    now     = pd.Timestamp.now()
+    result  = {}
     for fname, df in dfs.items():
+        kinds = col_kinds[fname]
         row = {}
+        parsed_dates = {}   # col → to_datetime result, shared by Validity and Timeliness
 
         # Completeness — exact (from scoring module)
         row["Completeness"] = details["completeness_per_file"].get(fname, 100)
@@ -1470,10 +1749,8 @@ def _per_file_scores(dfs: dict, score_data: dict) -> dict:
             non_null = df[col].dropna()
             if len(non_null) == 0:
                 col_scores.append(0); continue
-            if pd.api.types.is_numeric_dtype(df[col]):
-                is_money = bool(re.search(
-                    r"(amount|price|cost|revenue|salary|fee|total|value)", col, re.IGNORECASE))
-                if is_money:
+            if col in kinds["numeric"]:
+                if col in kinds["money"]:
                     neg = (df[col] < 0).sum()
                     col_scores.append(max(0, 100 - neg / len(df) * 200))
                 elif len(non_null) > 10:
@@ -1486,11 +1763,11 @@ def _per_file_scores(dfs: dict, score_data: dict) -> dict:
                         col_scores.append(85)
                 else:
                     col_scores.append(88)
-            elif re.search(r"(date|time|created|updated|timestamp)", col, re.IGNORECASE):
+            elif col in kinds["date"]:
                 try:
-                    parsed = pd.to_datetime(df[col], errors="coerce")
+                    parsed = parsed_dates[col] = pd.to_datetime(df[col], errors="coerce")
                     fail_rate = parsed.isna().sum() / len(df)
-                    future = (parsed > pd.Timestamp.now()).sum()
+                    future = (parsed > now).sum()
                     col_scores.append(max(0, round(100 - fail_rate*60 - (future/len(df))*30, 1)))
                 except Exception:
                     col_scores.append(70)
@@ -1500,17 +1777,19 @@ def _per_file_scores(dfs: dict, score_data: dict) -> dict:
 
         # Timeliness — find latest date
         date_vals = []
-        for col in df.columns:
-            if re.search(r"(date|time|created|updated)", col, re.IGNORECASE):
-                try:
-                    parsed = pd.to_datetime(df[col], errors="coerce").dropna()
-                    if len(parsed):
-                        date_vals.append(parsed)
-                except Exception:
-                    pass
+        for col in kinds["date"]:
+            try:
+                parsed = parsed_dates.get(col)
+                if parsed is None:
+                    parsed = pd.to_datetime(df[col], errors="coerce")
+                parsed = parsed.dropna()
+                if len(parsed):
+                    date_vals.append(parsed)
+            except Exception:
+                pass
         if date_vals:
             latest = pd.concat(date_vals).max()
-            days_old = (pd.Timestamp.now() - latest).days
+            days_old = (now - latest).days
             if   days_old <   7: row["Timeliness"] = 95
             elif days_old <  30: row["Timeliness"] = 82
             elif days_old <  90: row["Timeliness"] = 65
@@ -1523,12 +1802,12 @@ def _per_file_scores(dfs: dict, score_data: dict) -> dict:
     return result
 
 
-def render_quality_heatmap(dfs: dict, score_data: dict):
+def render_quality_heatmap(dfs: dict, score_data: dict, col_kinds: dict):
     """Render a per-file × per-dimension quality score heatmap."""
     if len(dfs) < 2:
         return
 
-    per_file = _per_file_scores(dfs, score_data)
+    per_file = _per_file_scores(dfs, score_data, col_kinds)
     dims  = ["Completeness", "Uniqueness", "Validity", "Timeliness"]
     files = list(per_file.keys())
 
@@ -1583,16 +1862,14 @@ def render_executive_summary(R: dict):
     details  = R["score_data"]["details"]
     overall  = scores["overall"]
     domain   = R["domain"]
-    lbl, _   = score_label(overall)
+    lbl, lc  = score_label(overall)
     grade, _ = overall_grade(overall)
     bench    = details.get("benchmark", "")
 
     # Count total issues
-    n_orphans = sum(f["orphan_count"] for f in R["orphans"].get("findings", []))
-    n_dupes   = sum(f["duplicate_count"] for f in R["dupes"].get("findings", []))
-    n_gaps    = sum(f["missing_count"] for f in R["gaps"].get("findings", []))
+    n_orphans, n_dupes, n_gaps = R["issue_totals"]
     total_issues = n_orphans + n_dupes + n_gaps
-    rows_total   = sum(len(df) for df in R["dfs"].values())
+    rows_total   = R["rows_total"]
 
     if total_issues == 0:
         summary = (f"We analyzed your {domain} dataset ({len(R['dfs'])} files, {rows_total:,} rows) "
@@ -1608,7 +1885,7 @@ def render_executive_summary(R: dict):
             f"We analyzed your <strong>{domain}</strong> pipeline "
             f"(<strong>{len(R['dfs'])} files · {rows_total:,} rows</strong>) and found "
             f"<strong style='color:#F85149'>{total_issues:,} issues</strong>: {issues_str}. "
-            f"Data quality score: <strong style='color:{score_color(overall)}'>{overall}/100 — Grade {grade}</strong>. "
+            f"Data quality score: <strong style='color:{lc}'>{overall}/100 — Grade {grade}</strong>. "
             f"{details.get('urgency','')}"
         )
         color = "#F85149"
@@ -1642,8 +1919,12 @@ def render_missing_file_suggestions(dfs: dict, domain: str):
     expected = DOMAIN_EXPECTED.get(domain, [])
     if not expected:
         return
-    present = " ".join(dfs.keys()).lower()
-    missing = [e for e in expected if e.rstrip("s") not in present and e not in present]
+    # Match per file name (exact first, then "orders" ⊂ "orders_2024"), never
+    # across the boundary between two names
+    present = {k.lower() for k in dfs}
+    missing = [e for e in expected
+               if e not in present and e.rstrip("s") not in present
+               and not any(e.rstrip("s") in k for k in present)]
     if not missing:
         return
     chips = "".join(
@@ -1667,72 +1948,40 @@ def render_missing_file_suggestions(dfs: dict, domain: str):
 # HTML report export
 # ─────────────────────────────────────────────────────────────────────────────
 
-def generate_html_report(R: dict) -> str:
-    scores  = R["score_data"]["scores"]
-    details = R["score_data"]["details"]
-    overall = scores["overall"]
-    grade, gc = overall_grade(overall)
-    lbl, lc   = score_label(overall)
-    now_str   = datetime.now().strftime("%Y-%m-%d %H:%M")
-
-    rows_total = sum(len(df) for df in R["dfs"].values())
-    bench = details.get("benchmark", "")
-
-    # Findings HTML
-    findings_html = ""
-    for f in R["orphans"].get("findings", [])[:2]:
-        pct = f["pct_of_source"]
-        findings_html += f"""
+# Downloadable HTML report — per-item fragments, filled with str.format
+_REPORT_ORPHAN = """
         <div style="border-left:4px solid #F85149;padding:12px 16px;margin-bottom:12px;background:#1a0808;border-radius:4px">
-          <div style="font-weight:700;color:#F85149">ORPHAN RECORDS — {f['direction']}</div>
-          <div style="font-size:22px;font-weight:900;color:#F85149;margin:4px 0">{f['orphan_count']:,} records ({pct}%) unmatched</div>
-          <div style="color:#999">Key: {f['key']} · Examples: {', '.join(str(v) for v in f['example_values'][:3])}</div>
+          <div style="font-weight:700;color:#F85149">ORPHAN RECORDS — {direction}</div>
+          <div style="font-size:22px;font-weight:900;color:#F85149;margin:4px 0">{count:,} records ({pct}%) unmatched</div>
+          <div style="color:#999">Key: {key} · Examples: {examples}</div>
         </div>"""
-    for f in R["dupes"].get("findings", [])[:1]:
-        findings_html += f"""
+_REPORT_DUPE = """
         <div style="border-left:4px solid #F0883E;padding:12px 16px;margin-bottom:12px;background:#1a0d00;border-radius:4px">
-          <div style="font-weight:700;color:#F0883E">ENTITY DUPLICATES — {f['file']}</div>
-          <div style="font-size:22px;font-weight:900;color:#F0883E;margin:4px 0">{f['duplicate_count']} duplicate entities</div>
-          <div style="color:#999">Type: {f['type']}</div>
+          <div style="font-weight:700;color:#F0883E">ENTITY DUPLICATES — {file}</div>
+          <div style="font-size:22px;font-weight:900;color:#F0883E;margin:4px 0">{count} duplicate entities</div>
+          <div style="color:#999">Type: {type}</div>
         </div>"""
-    for f in R["gaps"].get("findings", [])[:1]:
-        pct = f["pct_of_upstream"]
-        findings_html += f"""
+_REPORT_GAP = """
         <div style="border-left:4px solid #E3B341;padding:12px 16px;margin-bottom:12px;background:#1a1500;border-radius:4px">
-          <div style="font-weight:700;color:#E3B341">PROCESS GAP — {f['stage_from']} → {f['stage_to']}</div>
-          <div style="font-size:22px;font-weight:900;color:#E3B341;margin:4px 0">{f['missing_count']:,} records ({pct}%) stalled</div>
+          <div style="font-weight:700;color:#E3B341">PROCESS GAP — {stage_from} → {stage_to}</div>
+          <div style="font-size:22px;font-weight:900;color:#E3B341;margin:4px 0">{count:,} records ({pct}%) stalled</div>
         </div>"""
-
-    # Dimension rows
-    dim_rows = ""
-    for key, label, _ in DIMS:
-        val = scores.get(key)
-        c   = score_color(val)
-        lbl_d, _ = score_label(val)
-        w   = int(R["score_data"]["weights"].get(key, 0) * 100)
-        v   = f"{val:.0f}" if val is not None else "N/A"
-        dim_rows += f"""
+_REPORT_DIM_ROW = """
         <tr>
           <td style="padding:8px 12px;color:#C9D1D9">{label}</td>
-          <td style="padding:8px 12px;color:#6E7681">{w}%</td>
-          <td style="padding:8px 12px;font-weight:700;color:{c};font-family:monospace">{v}</td>
-          <td style="padding:8px 12px;color:{c}">{lbl_d}</td>
+          <td style="padding:8px 12px;color:#6E7681">{wstr}</td>
+          <td style="padding:8px 12px;font-weight:700;color:{c};font-family:monospace">{vstr}</td>
+          <td style="padding:8px 12px;color:{c}">{lbl}</td>
         </tr>"""
-
-    # Recommendations HTML
-    recs_html = ""
-    for rec in R["recs"]:
-        s = SEV.get(rec["severity"], SEV["medium"])
-        steps = "".join(f"<li style='margin-bottom:6px;color:#C9D1D9'>{st_}</li>" for st_ in rec["full_steps"])
-        recs_html += f"""
-        <div style="background:{s['bg']};border:1px solid {s['border']};border-radius:8px;padding:16px;margin-bottom:12px">
-          <div style="font-size:15px;font-weight:700;color:#E6EDF3;margin-bottom:8px">{rec['icon']} {rec['title']}</div>
-          <div style="font-size:13px;color:#8B949E;margin-bottom:10px"><strong style="color:#C9D1D9">Root cause:</strong> {rec['full_root_cause']}</div>
+_REPORT_REC = """
+        <div style="background:{s[bg]};border:1px solid {s[border]};border-radius:8px;padding:16px;margin-bottom:12px">
+          <div style="font-size:15px;font-weight:700;color:#E6EDF3;margin-bottom:8px">{rec[icon]} {rec[title]}</div>
+          <div style="font-size:13px;color:#8B949E;margin-bottom:10px"><strong style="color:#C9D1D9">Root cause:</strong> {rec[full_root_cause]}</div>
           <ol style="font-size:13px;padding-left:16px;margin:0 0 10px">{steps}</ol>
-          <div style="font-size:12px;color:#6E7681">⏱ {rec['effort']} &nbsp;|&nbsp; 🛡 {rec['prevention']}</div>
+          <div style="font-size:12px;color:#6E7681">⏱ {rec[effort]} &nbsp;|&nbsp; 🛡 {rec[prevention]}</div>
         </div>"""
 
-    return f"""<!DOCTYPE html>
+_REPORT_SHELL = """<!DOCTYPE html>
 <html lang="en">
 <head>
 <meta charset="UTF-8">
@@ -1756,7 +2005,7 @@ def generate_html_report(R: dict) -> str:
   <div style="color:{gc};font-size:18px;font-weight:700">{lbl} · Grade {grade}</div>
   <div class="badge" style="margin-top:8px">{bench}</div>
   <div style="font-size:13px;color:#6E7681;margin-top:12px">
-    Generated: {now_str} · Domain: {R['domain']} · {len(R['dfs'])} files · {rows_total:,} rows
+    Generated: {now_str} · Domain: {domain} · {n_files} files · {rows_total:,} rows
   </div>
 </div>
 
@@ -1767,10 +2016,10 @@ def generate_html_report(R: dict) -> str:
 </table>
 
 <h2>Critical Findings</h2>
-{findings_html if findings_html else '<p style="color:#3FB950">✅ No critical issues found.</p>'}
+{findings_html}
 
 <h2>Full Remediation Plan</h2>
-{recs_html if recs_html else '<p style="color:#3FB950">✅ No recommendations — data looks solid.</p>'}
+{recs_html}
 
 <div class="footer">
   Generated by DataQuality.ai · dataqualityanalyzer.streamlit.app
@@ -1779,6 +2028,70 @@ def generate_html_report(R: dict) -> str:
 </html>"""
 
 
+def generate_html_report(R: dict) -> str:
+    scores  = R["score_data"]["scores"]
+    details = R["score_data"]["details"]
+    overall = scores["overall"]
+    grade, gc = overall_grade(overall)
+    lbl, lc   = score_label(overall)
+    now_str   = datetime.now().strftime("%Y-%m-%d %H:%M")
+
+    rows_total = R["rows_total"]
+    bench = details.get("benchmark", "")
+
+    # Findings HTML
+    findings_html = "".join(
+        [_REPORT_ORPHAN.format(
+            direction=_esc(f["direction"]), count=f["orphan_count"], pct=f["pct_of_source"],
+            key=_esc(f["key"]), examples=_esc(f["example_values_str"]))
+         for f in R["top_orphans"]]
+        + [_REPORT_DUPE.format(file=_esc(f["file"]), count=f["duplicate_count"], type=_esc(f["type"]))
+           for f in R["top_dupes"]]
+        + [_REPORT_GAP.format(stage_from=_esc(f["stage_from"]), stage_to=_esc(f["stage_to"]),
+                              count=f["missing_count"], pct=f["pct_of_upstream"])
+           for f in R["top_gaps"]]
+    )
+
+    # Dimension rows
+    weights  = R["score_data"]["weights"]
+    dim_rows = "".join(_REPORT_DIM_ROW.format_map(_dim_row_ctx(key, label, sub, scores, weights))
+                       for key, label, sub in DIMS)
+
+    # Recommendations HTML
+    recs_html = "".join(
+        _REPORT_REC.format(
+            s=rec["_sev_style"], rec=rec["_esc"],
+            steps="".join(f"<li style='margin-bottom:6px;color:#C9D1D9'>{st_}</li>"
+                          for st_ in rec["_esc"]["full_steps"]))
+        for rec in R["recs"]
+    )
+
+    return _REPORT_SHELL.format(
+        now_str=now_str, gc=gc, overall=overall, lbl=lbl, grade=grade, bench=bench,
+        domain=_esc(R["domain"]), n_files=len(R["dfs"]), rows_total=rows_total, dim_rows=dim_rows,
+        findings_html=findings_html or '<p style="color:#3FB950">✅ No critical issues found.</p>',
+        recs_html=recs_html or '<p style="color:#3FB950">✅ No recommendations — data looks solid.</p>',
+    )
+
+
+def _flow_map_once(R: dict) -> go.Figure:
+    """make_flow_map, memoized on the results dict like _html_report_once —
+    the map only changes when a new diagnostic replaces R."""
+    if "_flow_fig" not in R:
+        R["_flow_fig"] = make_flow_map(R["dfs"], R["joins"], R["orphans"], R["gaps"])
+    return R["_flow_fig"]
+
+
+def _html_report_once(R: dict) -> str:
+    """generate_html_report, memoized on the results dict itself.
+    R lives in session_state until the next diagnostic replaces it, so repeat
+    downloads reuse the first render. (st.cache_data would have to hash every
+    DataFrame in R, or key on id(R), which a later R can reuse.)"""
+    if "_html_report" not in R:
+        R["_html_report"] = generate_html_report(R)
+    return R["_html_report"]
+
+
 def render_assessment_form(preview_dfs: dict) -> dict:
     """
     Show a short pre-analysis assessment form.
@@ -1802,7 +2115,7 @@ def render_assessment_form(preview_dfs: dict) -> dict:
         monetary_defaults[fname] = [c for c, t in sem.items() if t == "monetary"]
         # Default PK: first col matching id pattern
         pk_defaults[fname] = next(
-            (c for c in df.columns if re.search(r"(^id$|_id$|_key$)", c, re.IGNORECASE)),
+            (c for c in df.columns if _PK_RE.search(c)),
             None
         )
 
@@ -1918,16 +2231,43 @@ def render_assessment_form(preview_dfs: dict) -> dict:
     return cfg
 
 
+def _read_csv_bytes(data: bytes) -> pd.DataFrame:
+    """Parse an uploaded CSV with Arrow's multithreaded reader; fall back to
+    the C engine for dialects it rejects. Columns stay NumPy-backed: Arrow
+    dtypes turn missing reductions into pd.NA, which the checks' comparisons
+    don't expect."""
+    try:
+        return pd.read_csv(io.BytesIO(data), engine="pyarrow")
+    except Exception:
+        return pd.read_csv(io.BytesIO(data))
+
+
+def _downcast_ints(df: pd.DataFrame) -> pd.DataFrame:
+    """Narrow integer columns to the smallest width that holds them — the
+    checks' hash sets and isin lookups scale with element size. Floats stay
+    64-bit (monetary averages), text stays text (checks compare it as str)."""
+    for col in df.select_dtypes("integer").columns:
+        df[col] = pd.to_numeric(df[col], downcast="integer")
+    return df
+
+
 def run_analysis(uploaded_files, cfg=None) -> tuple:
+    """Run the full diagnostic. Keyed on file names + bytes, so re-running on
+    an unchanged upload is served from cache instead of re-parsing."""
+    return _run_analysis_cached(tuple((f.name, f.getvalue()) for f in uploaded_files), cfg)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _run_analysis_cached(files: tuple, cfg=None) -> tuple:
     dfs, errors = {}, []
-    for f in uploaded_files:
-        name = re.sub(r"\.csv$", "", f.name, flags=re.IGNORECASE)
+    for fname, data in files:
+        name = _CSV_EXT_RE.sub("", fname)
         try:
-            df = pd.read_csv(f)
-            df.columns = [c.strip().lower().replace(" ", "_") for c in df.columns]
-            dfs[name] = df
+            df = _read_csv_bytes(data)
+            df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_", regex=False)
+            dfs[name] = _downcast_ints(df)
         except Exception as e:
-            errors.append(f"Could not read **{f.name}**: {e}")
+            errors.append(f"Could not read **{fname}**: {e}")
 
     if not dfs:
         return None, errors
@@ -1941,33 +2281,77 @@ def run_analysis(uploaded_files, cfg=None) -> tuple:
             if (uj["file_a"], uj["file_b"]) not in existing:
                 joins.append(uj)
 
-    orphans    = check_orphan_records(dfs, joins)
-    dupes      = check_entity_duplicates(dfs, joins)
-    gaps       = check_process_gaps(dfs, joins)
-    score_data = calculate_scores(dfs, orphans, dupes, gaps, len(dfs))
-    recs       = generate_recommendations(orphans, dupes, gaps, score_data)
+    # The three checks only read dfs/joins; pandas releases the GIL in their
+    # hash/groupby kernels, so they overlap on threads
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="dq-check") as ex:
+        f_orphans = ex.submit(check_orphan_records, dfs, joins)
+        f_dupes   = ex.submit(check_entity_duplicates, dfs, joins)
+        f_gaps    = ex.submit(check_process_gaps, dfs, joins)
+
+        # Semantic layer — name/column-header string matching only, so it runs
+        # here while the workers are busy instead of queueing behind them
+        entities = {name: detect_entity(name, df) for name, df in dfs.items()}
+        domain, conf = detect_domain(dfs)
+
+        orphans, dupes, gaps = f_orphans.result(), f_dupes.result(), f_gaps.result()
+
+        # Impact only needs the findings (plus the monetary-column scan), so it
+        # overlaps with scoring on this thread
+        monetary_override = cfg.get("monetary") if cfg else None
+        f_impact = ex.submit(estimate_monetary_impact, dfs, orphans, dupes, gaps,
+                             monetary_override=monetary_override)
 
-    # Semantic layer
-    entities = {name: detect_entity(name, df) for name, df in dfs.items()}
-    domain, conf = detect_domain(dfs)
+        score_data = calculate_scores(dfs, orphans, dupes, gaps, len(dfs))
+        impact     = f_impact.result()
+    recs       = generate_recommendations(orphans, dupes, gaps, score_data)
+    for r in recs:                                   # resolve colours, escape text once
+        r["_sev_style"] = SEV.get(r.get("severity", "medium"), SEV["medium"])
+        r["_esc"]       = _rec_escaped(r)
+    rec_html   = "".join(map(_rec_full_html, recs))  # static after analysis; one element
+    # Locked-state cards: top-3 teasers + blurred preview of the rest
+    locked     = recs[3:] if len(recs) > 3 else recs[1:] if len(recs) > 1 else recs
+    rec_gate_html = {
+        "teasers": "".join(map(_rec_teaser_html, recs[:3])),
+        "locked":  "".join(map(_locked_rec_card_html, locked[:4])),
+        "counts":  {
+            "n_fixes":    len(recs),
+            "n_critical": sum(1 for r in recs if r.get("severity") == "critical"),
+            "n_high":     sum(1 for r in recs if r.get("severity") == "high"),
+        },
+    }
 
     # Override domain if user specified
     if cfg and cfg.get("domain"):
         domain, conf = cfg["domain"], 1.0
 
-    # Pass monetary override to impact calculation
-    monetary_override = cfg.get("monetary") if cfg else None
-    impact    = estimate_monetary_impact(dfs, orphans, dupes, gaps,
-                                         monetary_override=monetary_override)
     narrative = generate_narrative(dfs, domain, entities, orphans, dupes, gaps,
                                    score_data["scores"]["overall"])
+    # Insight text embeds file/entity names — escaped once here, not per rerun
+    narrative_html = "".join(_insight_html(n["icon"], _esc(n["title"]), _esc(n["text"]))
+                             for n in narrative)
+
+    # Findings shown on cards and in the report — sliced once, shared by both
+    top_orphans = orphans.get("findings", [])[:2]
+    top_dupes   = dupes.get("findings", [])[:1]
+    top_gaps    = gaps.get("findings", [])[:1]
 
     return {
         "dfs": dfs, "joins": joins,
         "orphans": orphans, "dupes": dupes, "gaps": gaps,
-        "score_data": score_data, "recs": recs,
+        "score_data": score_data, "recs": recs, "rec_html": rec_html,
+        "rec_gate_html": rec_gate_html,
         "entities": entities, "domain": domain, "domain_conf": conf,
-        "impact": impact, "narrative": narrative,
+        "impact": impact, "narrative": narrative, "narrative_html": narrative_html,
+        "col_kinds": _column_kinds(dfs),
+        "top_orphans": top_orphans, "top_dupes": top_dupes, "top_gaps": top_gaps,
+        # Row counts behind every summary pill/narrative: orphans, dupes, gaps
+        "issue_totals": (
+            sum(f["orphan_count"]    for f in orphans.get("findings", [])),
+            sum(f["duplicate_count"] for f in dupes.get("findings", [])),
+            sum(f["missing_count"]   for f in gaps.get("findings", [])),
+        ),
+        "findings_html": _critical_findings_html(top_orphans, top_dupes, top_gaps),
+        "rows_total": sum(len(df) for df in dfs.values()),
     }, errors
 
 
@@ -2088,24 +2472,16 @@ def _benchmark_html(score: float, color: str) -> str:
     </div>"""
 
 
-def _column_health_html(dfs: dict) -> str:
-    """Per-column completeness bars — compact list per file."""
-    if not dfs:
-        return ""
-    parts = []
-    for fname, df in dfs.items():
-        cols = list(df.columns)[:12]
-        rows_html = ""
-        for col in cols:
-            fill = df[col].notna().mean() * 100
-            c    = "#3FB950" if fill >= 95 else ("#E3B341" if fill >= 80 else "#F85149")
-            short_col = col if len(col) <= 20 else col[:18] + "…"
-            rows_html += f"""
+def _column_health_row(col: str, fill: float) -> str:
+    """One completeness bar in the column-health list."""
+    c = "#3FB950" if fill >= 95 else ("#E3B341" if fill >= 80 else "#F85149")
+    short_col = col if len(col) <= 20 else col[:18] + "…"
+    return f"""
             <div style="display:grid;grid-template-columns:150px 1fr 38px;
                         align-items:center;gap:10px;margin-bottom:7px">
               <div style="font-size:11px;color:#C9D1D9;overflow:hidden;
                           text-overflow:ellipsis;white-space:nowrap"
-                   title="{col}">{short_col}</div>
+                   title="{_esc(col)}">{_esc(short_col)}</div>
               <div style="background:#21262D;border-radius:999px;height:5px;overflow:hidden">
                 <div style="width:{fill:.0f}%;background:{c};height:5px;
                             border-radius:999px"></div>
@@ -2115,13 +2491,24 @@ def _column_health_html(dfs: dict) -> str:
                 {fill:.0f}%
               </div>
             </div>"""
+
+
+def _column_health_html(dfs: dict) -> str:
+    """Per-column completeness bars — compact list per file."""
+    if not dfs:
+        return ""
+    parts = []
+    for fname, df in dfs.items():
+        fills = df.iloc[:, :12].notna().mean() * 100
+        cols  = list(fills.index)
+        rows_html = "".join(_column_health_row(col, fill) for col, fill in fills.items())
         hidden = len(df.columns) - len(cols)
         extra = (f'<div style="font-size:10px;color:#484F58;margin-top:4px">'
                  f'+{hidden} more columns not shown</div>') if hidden else ""
         parts.append(f"""
         <div style="margin-bottom:20px">
           <div style="font-size:11px;font-weight:700;color:#79C0FF;margin-bottom:10px">
-            📄 {fname}
+            📄 {_esc(fname)}
             <span style="font-size:10px;color:#484F58;font-weight:400;margin-left:6px">
               {len(df):,} rows · {len(df.columns)} columns
             </span>
@@ -2132,34 +2519,36 @@ def _column_health_html(dfs: dict) -> str:
     return "\n".join(parts)
 
 
+def _preview_cell_html(val) -> str:
+    """One <td> of the simple-mode preview; nulls highlighted orange."""
+    is_null = pd.isna(val)
+    bg  = "background:#3d1200;border-left:2px solid #F0883E44;" if is_null else ""
+    txt = ('<span style="color:#F0883E;font-style:italic;font-size:10px">null</span>'
+           if is_null else
+           f'<span style="color:#C9D1D9">{_esc(str(val)[:24])}</span>')
+    return (f'<td style="padding:6px 10px;{bg}border-bottom:1px solid #21262D;'
+            f'font-size:11px;font-family:\'JetBrains Mono\',monospace;'
+            f'white-space:nowrap">{txt}</td>')
+
+
 def _df_preview_html(dfs: dict, max_rows: int = 5) -> str:
     """First N rows per file — null cells highlighted orange."""
     if not dfs:
         return ""
     parts = []
     for fname, df in dfs.items():
-        cols   = list(df.columns)[:8]
-        subset = df[cols].head(max_rows)
+        subset = df.iloc[:max_rows, :8]   # slice rows first — no full-height column copy
+        cols   = list(subset.columns)
         th = "".join(
             f'<th style="padding:7px 10px;text-align:left;font-size:10px;font-weight:700;'
             f'color:#484F58;text-transform:uppercase;letter-spacing:.4px;'
-            f'border-bottom:1px solid #30363D;white-space:nowrap;background:#161B22">{c}</th>'
+            f'border-bottom:1px solid #30363D;white-space:nowrap;background:#161B22">{_esc(c)}</th>'
             for c in cols
         )
-        tr_html = ""
-        for _, row in subset.iterrows():
-            cells = ""
-            for c in cols:
-                val     = row[c]
-                is_null = pd.isna(val)
-                bg  = "background:#3d1200;border-left:2px solid #F0883E44;" if is_null else ""
-                txt = ('<span style="color:#F0883E;font-style:italic;font-size:10px">null</span>'
-                       if is_null else
-                       f'<span style="color:#C9D1D9">{str(val)[:24]}</span>')
-                cells += (f'<td style="padding:6px 10px;{bg}border-bottom:1px solid #21262D;'
-                          f'font-size:11px;font-family:\'JetBrains Mono\',monospace;'
-                          f'white-space:nowrap">{txt}</td>')
-            tr_html += f'<tr>{cells}</tr>'
+        tr_html = "".join(
+            f'<tr>{"".join(_preview_cell_html(val) for val in row)}</tr>'
+            for row in subset.itertuples(index=False)
+        )
 
         null_total = int(subset.isna().sum().sum())
         null_note  = (f'<span style="color:#F0883E">■</span> {null_total} null cells in preview'
@@ -2171,7 +2560,7 @@ def _df_preview_html(dfs: dict, max_rows: int = 5) -> str:
         <div style="margin-bottom:20px">
           <div style="display:flex;justify-content:space-between;align-items:center;
                       margin-bottom:8px">
-            <span style="font-size:11px;font-weight:700;color:#79C0FF">📄 {fname}</span>
+            <span style="font-size:11px;font-weight:700;color:#79C0FF">📄 {_esc(fname)}</span>
             <span style="font-size:10px;color:#484F58">{null_note}{col_note}</span>
           </div>
           <div style="overflow-x:auto;border:1px solid #30363D;border-radius:8px">
@@ -2227,10 +2616,10 @@ def _quick_win_html(R: dict) -> str:
       </div>
       <div style="font-size:13px;font-weight:700;color:#E6EDF3;
                   margin-bottom:6px;line-height:1.5">
-        {top['title']}
+        {top['_esc']['title']}
       </div>
       <div style="font-size:11px;color:#8B949E;margin-bottom:12px;line-height:1.6">
-        {top['teaser_metric']}
+        {top['_esc']['teaser_metric']}
       </div>
       <div style="display:flex;align-items:center;gap:8px;flex-wrap:wrap">
         <div style="background:#0A160A;border:1px solid #238636;
@@ -2317,6 +2706,26 @@ def _generate_it_report(R: dict) -> str:
     return "\n".join(lines)
 
 
+# Simple-mode issue card — shared by the dashboard and the detail panel
+_ISSUE_CARD = """
+        <div style="background:#0D1117;border:1px solid #30363D;border-left:4px solid {color};
+                    border-radius:10px;padding:16px 18px;margin-bottom:10px">
+          <div style="display:flex;align-items:center;gap:8px;margin-bottom:8px">
+            <span style="font-size:16px">{icon}</span>
+            <span style="font-size:10px;font-weight:700;color:{color};text-transform:uppercase;
+                         letter-spacing:1.2px">{sev_label}</span>
+            <span style="font-size:12px;font-weight:700;color:#8B949E">· {headline}</span>
+          </div>
+          <div style="font-size:13px;color:#C9D1D9;line-height:1.7;margin-bottom:8px">{body}</div>
+          <div style="font-size:11px;color:#6E7681;background:#161B22;border-radius:6px;
+                      padding:6px 10px;display:inline-block">💡 {impact_line}</div>
+        </div>"""
+
+def _issue_card_html(color, sev_label, icon, headline, body, impact_line) -> str:
+    return _ISSUE_CARD.format(color=color, sev_label=sev_label, icon=icon,
+                              headline=headline, body=body, impact_line=impact_line)
+
+
 def render_simple_dashboard(R: dict):
     """Premium BI dashboard: gauge + dim bars + issue rates + benchmark
        + issue cards + quick win + column health + data preview."""
@@ -2327,10 +2736,8 @@ def render_simple_dashboard(R: dict):
     lbl, _    = score_label(overall)
     bench     = details.get("benchmark", "")
 
-    n_orphans  = sum(f["orphan_count"]    for f in R["orphans"].get("findings", []))
-    n_dupes    = sum(f["duplicate_count"] for f in R["dupes"].get("findings", []))
-    n_gaps     = sum(f["missing_count"]   for f in R["gaps"].get("findings", []))
-    rows_total = sum(len(df) for df in R["dfs"].values())
+    n_orphans, n_dupes, n_gaps = R["issue_totals"]
+    rows_total = R["rows_total"]
     file_names = " · ".join(R["dfs"].keys())
 
     # ── Severity badge counts ──────────────────────────────────────────────────
@@ -2355,68 +2762,6 @@ def render_simple_dashboard(R: dict):
         badge_html = ('<span style="background:#238636;color:#fff;font-size:11px;font-weight:700;'
                       'padding:4px 12px;border-radius:999px;margin-left:8px">✓ Clean</span>')
 
-    # ── Issue cards ────────────────────────────────────────────────────────────
-    def _issue_card(color, sev_label, icon, headline, body, impact_line):
-        return f"""
-        <div style="background:#0D1117;border:1px solid #30363D;border-left:4px solid {color};
-                    border-radius:10px;padding:16px 18px;margin-bottom:10px">
-          <div style="display:flex;align-items:center;gap:8px;margin-bottom:8px">
-            <span style="font-size:16px">{icon}</span>
-            <span style="font-size:10px;font-weight:700;color:{color};text-transform:uppercase;
-                         letter-spacing:1.2px">{sev_label}</span>
-            <span style="font-size:12px;font-weight:700;color:#8B949E">· {headline}</span>
-          </div>
-          <div style="font-size:13px;color:#C9D1D9;line-height:1.7;margin-bottom:8px">{body}</div>
-          <div style="font-size:11px;color:#6E7681;background:#161B22;border-radius:6px;
-                      padding:6px 10px;display:inline-block">💡 {impact_line}</div>
-        </div>"""
-
-    issue_html = ""
-    for f in R["orphans"].get("findings", [])[:1]:
-        left  = f["direction"].split("→")[0].strip()
-        right = f["direction"].split("→")[1].strip() if "→" in f["direction"] else "the other file"
-        ic    = "#F85149" if f["pct_of_source"] > 25 else "#F0883E"
-        sev   = "Critical Issue" if f["pct_of_source"] > 25 else "High Priority Issue"
-        issue_html += _issue_card(
-            ic, sev, "🔗", "Unmatched Records",
-            f"<strong style='color:#E6EDF3'>{f['orphan_count']:,} records</strong> in "
-            f"<em style='color:#79C0FF'>{left}</em> have no corresponding entry in "
-            f"<em style='color:#79C0FF'>{right}</em>.",
-            "These records won't appear in any of your reports, totals, or dashboards."
-        )
-    for f in R["dupes"].get("findings", [])[:1]:
-        dc  = "#F85149" if f["duplicate_count"] > 10 else "#F0883E"
-        sev = "Critical Issue" if f["duplicate_count"] > 10 else "High Priority Issue"
-        issue_html += _issue_card(
-            dc, sev, "👥", "Duplicate Records",
-            f"<em style='color:#79C0FF'>{f['file']}</em> contains "
-            f"<strong style='color:#E6EDF3'>{f['duplicate_count']} duplicate {f['type']}</strong> "
-            f"entries — the same real-world entity appears multiple times.",
-            "Your totals, counts, and averages are inflated by these duplicates."
-        )
-    for f in R["gaps"].get("findings", [])[:1]:
-        gc2 = "#F85149" if f["pct_of_upstream"] > 20 else "#E3B341"
-        sev = "High Priority Issue" if f["pct_of_upstream"] > 5 else "Medium Priority Issue"
-        issue_html += _issue_card(
-            gc2, sev, "⚡", "Incomplete Records",
-            f"<strong style='color:#E6EDF3'>{f['pct_of_upstream']}% of records</strong> "
-            f"start at <em style='color:#79C0FF'>{f['stage_from']}</em> but never "
-            f"reach <em style='color:#79C0FF'>{f['stage_to']}</em>.",
-            "These records are invisible in your downstream reports and completions tracking."
-        )
-    if not issue_html:
-        issue_html = """
-        <div style="background:#0A160A;border:1px solid #238636;border-radius:10px;
-                    padding:20px;text-align:center">
-          <div style="font-size:28px;margin-bottom:8px">✅</div>
-          <div style="font-size:14px;font-weight:700;color:#3FB950">
-            No data integrity issues found
-          </div>
-          <div style="font-size:12px;color:#6E7681;margin-top:4px">
-            Your records match correctly across all files.
-          </div>
-        </div>"""
-
     # ── Issue rate stats (% of rows) ─────────────────────────────────────────
     orphan_pct = round(n_orphans / rows_total * 100, 1) if rows_total else 0
     dupe_pct   = round(n_dupes   / rows_total * 100, 1) if rows_total else 0
@@ -2456,8 +2801,8 @@ def render_simple_dashboard(R: dict):
         at_risk_sub   = f"rows with confirmed issues ({at_risk_pct}% of total)"
         at_risk_color = "#F0883E"
 
-    n_fixes          = len(R["recs"])
-    n_critical_fixes = sum(1 for r in R["recs"] if r["severity"] == "critical")
+    n_fixes          = R["rec_gate_html"]["counts"]["n_fixes"]
+    n_critical_fixes = R["rec_gate_html"]["counts"]["n_critical"]
     today            = datetime.now().strftime("%b %d, %Y")
 
     # ── Dashboard header ──────────────────────────────────────────────────────
@@ -2507,7 +2852,7 @@ def render_simple_dashboard(R: dict):
         st.plotly_chart(
             make_speedometer(overall),
             use_container_width=True,
-            config={"displayModeBar": False},
+            config={"staticPlot": True, "displayModeBar": False},
         )
         grade_meaning = _grade_meaning(grade)
         st.markdown(f"""
@@ -2585,61 +2930,45 @@ def render_simple_detail_panel(R: dict):
     """Issues + quick win + column health + data preview + CTA + download.
     Called only after the email gate is passed."""
     scores  = R["score_data"]["scores"]
-    n_orphans  = sum(f["orphan_count"]    for f in R["orphans"].get("findings", []))
-    n_dupes    = sum(f["duplicate_count"] for f in R["dupes"].get("findings", []))
-    n_gaps     = sum(f["missing_count"]   for f in R["gaps"].get("findings", []))
-    n_fixes          = len(R["recs"])
-    n_critical_fixes = sum(1 for r in R["recs"] if r["severity"] == "critical")
+    n_orphans, n_dupes, n_gaps = R["issue_totals"]
+    n_fixes          = R["rec_gate_html"]["counts"]["n_fixes"]
+    n_critical_fixes = R["rec_gate_html"]["counts"]["n_critical"]
 
     # ── Issue cards ────────────────────────────────────────────────────────────
-    def _issue_card(color, sev_label, icon, headline, body, impact_line):
-        return f"""
-        <div style="background:#0D1117;border:1px solid #30363D;border-left:4px solid {color};
-                    border-radius:10px;padding:16px 18px;margin-bottom:10px">
-          <div style="display:flex;align-items:center;gap:8px;margin-bottom:8px">
-            <span style="font-size:16px">{icon}</span>
-            <span style="font-size:10px;font-weight:700;color:{color};text-transform:uppercase;
-                         letter-spacing:1.2px">{sev_label}</span>
-            <span style="font-size:12px;font-weight:700;color:#8B949E">· {headline}</span>
-          </div>
-          <div style="font-size:13px;color:#C9D1D9;line-height:1.7;margin-bottom:8px">{body}</div>
-          <div style="font-size:11px;color:#6E7681;background:#161B22;border-radius:6px;
-                      padding:6px 10px;display:inline-block">💡 {impact_line}</div>
-        </div>"""
-
-    issue_html = ""
-    for f in R["orphans"].get("findings", [])[:1]:
+    issue_cards = []
+    for f in R["top_orphans"][:1]:
         left  = f["direction"].split("→")[0].strip()
         right = f["direction"].split("→")[1].strip() if "→" in f["direction"] else "the other file"
         ic    = "#F85149" if f["pct_of_source"] > 25 else "#F0883E"
         sev   = "Critical" if f["pct_of_source"] > 25 else "High Priority"
-        issue_html += _issue_card(
+        issue_cards.append(_issue_card_html(
             ic, sev, "🔗", "Unmatched Records",
             f"<strong style='color:#E6EDF3'>{f['orphan_count']:,} records</strong> in "
-            f"<em style='color:#79C0FF'>{left}</em> have no match in "
-            f"<em style='color:#79C0FF'>{right}</em>.",
+            f"<em style='color:#79C0FF'>{_esc(left)}</em> have no match in "
+            f"<em style='color:#79C0FF'>{_esc(right)}</em>.",
             "These rows won't appear in any of your reports or totals."
-        )
-    for f in R["dupes"].get("findings", [])[:1]:
+        ))
+    for f in R["top_dupes"]:
         dc  = "#F85149" if f["duplicate_count"] > 10 else "#F0883E"
         sev = "Critical" if f["duplicate_count"] > 10 else "High Priority"
-        issue_html += _issue_card(
+        issue_cards.append(_issue_card_html(
             dc, sev, "👥", "Duplicate Records",
-            f"<em style='color:#79C0FF'>{f['file']}</em> has "
-            f"<strong style='color:#E6EDF3'>{f['duplicate_count']} duplicate {f['type']}</strong> "
+            f"<em style='color:#79C0FF'>{_esc(f['file'])}</em> has "
+            f"<strong style='color:#E6EDF3'>{f['duplicate_count']} duplicate {_esc(f['type'])}</strong> "
             f"entries — same entity appearing more than once.",
             "Your totals and counts are inflated."
-        )
-    for f in R["gaps"].get("findings", [])[:1]:
+        ))
+    for f in R["top_gaps"]:
         gc2 = "#F85149" if f["pct_of_upstream"] > 20 else "#E3B341"
         sev = "High Priority" if f["pct_of_upstream"] > 5 else "Medium"
-        issue_html += _issue_card(
+        issue_cards.append(_issue_card_html(
             gc2, sev, "⚡", "Missing Records",
             f"<strong style='color:#E6EDF3'>{f['pct_of_upstream']}% of records</strong> "
-            f"start at <em style='color:#79C0FF'>{f['stage_from']}</em> but never reach "
-            f"<em style='color:#79C0FF'>{f['stage_to']}</em>.",
+            f"start at <em style='color:#79C0FF'>{_esc(f['stage_from'])}</em> but never reach "
+            f"<em style='color:#79C0FF'>{_esc(f['stage_to'])}</em>.",
             "These records are invisible in your downstream reports."
-        )
+        ))
+    issue_html = "".join(issue_cards)
     if not issue_html:
         issue_html = """
         <div style="background:#0A160A;border:1px solid #238636;border-radius:10px;
@@ -2729,7 +3058,7 @@ def render_simple_detail_panel(R: dict):
     with share_col:
         st.download_button(
             label="📤  Share with IT Team",
-            data=_generate_it_report(R),
+            data=lambda: _generate_it_report(R),
             file_name=f"data_quality_report_{datetime.now().strftime('%Y%m%d_%H%M')}.txt",
             mime="text/plain",
             use_container_width=True,
@@ -2748,17 +3077,359 @@ def _render_simple_impact(R: dict, light: bool = False):
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-# Main app
+# Remediation gate
 # ─────────────────────────────────────────────────────────────────────────────
 
-def main():
+def _submit_lead_capture():
+    """Form submit handler — runs before the fragment reruns, so a valid
+    submission renders the unlocked plan without an extra st.rerun()."""
+    ss      = st.session_state
+    name    = ss.get("lead_name", "").strip()
+    company = ss.get("lead_company", "").strip()
+    email   = ss.get("lead_email", "").strip()
+    role    = ss.get("lead_role", "Select…")
+    errs = []
+    if not name:                           errs.append("Full Name is required.")
+    if not company:                        errs.append("Company is required.")
+    if not _EMAIL_RE.match(email):         errs.append("A valid work email is required.")
+    if role == "Select…":                  errs.append("Please select your role.")
+    if not ss.get("lead_consent"):         errs.append("Please accept the terms to continue.")
+    if errs:
+        ss.lead_errors = errs
+        return
+    _queue_lead(name, company, email, role)
+    ss.user_info       = {"name": name, "company": company, "email": email, "role": role}
+    ss.email_submitted = True
+    ss.show_form       = False
+
+
+# Static blocks of the remediation gate — built once at import, not per rerun
+
+# Fake SQL block adds visual richness to the blurred preview
+_LOCKED_FLAIR_HTML = """
+    <div style="background:#0D1117;border:1px solid #30363D;border-radius:10px;
+                padding:20px;margin-bottom:14px">
+      <div style="font-size:11px;font-weight:700;color:#6E7681;text-transform:uppercase;
+                  letter-spacing:1px;margin-bottom:12px">💻 SQL Fix Queries</div>
+      <pre style="background:#010409;border:1px solid #21262D;border-radius:6px;
+                  padding:16px;font-size:12px;color:#79C0FF;
+                  font-family:'JetBrains Mono',monospace;overflow-x:auto;margin:0">UPDATE orders o
+LEFT JOIN customers c ON o.customer_id = c.id
+SET o.status = 'orphaned'
+WHERE c.id IS NULL;
+
+-- Deduplicate entities
+WITH ranked AS (
+  SELECT *, ROW_NUMBER() OVER (
+    PARTITION BY email ORDER BY created_at DESC
+  ) AS rn FROM customers
+)
+DELETE FROM customers WHERE rn &gt; 1;</pre>
+    </div>
+    <div style="background:#161B22;border:1px solid #21262D;border-radius:10px;
+                padding:20px;margin-bottom:14px">
+      <div style="font-size:11px;font-weight:700;color:#6E7681;text-transform:uppercase;
+                  letter-spacing:1px;margin-bottom:16px">📈 Impact & Effort Matrix</div>
+      <div style="display:grid;grid-template-columns:1fr 1fr 1fr;gap:12px">
+        <div style="background:#0D1117;border-radius:8px;padding:14px;text-align:center">
+          <div style="font-size:22px;font-weight:900;color:#F85149;font-family:'JetBrains Mono',monospace">4h</div>
+          <div style="font-size:11px;color:#6E7681;margin-top:4px">Avg fix time</div>
+        </div>
+        <div style="background:#0D1117;border-radius:8px;padding:14px;text-align:center">
+          <div style="font-size:22px;font-weight:900;color:#3FB950;font-family:'JetBrains Mono',monospace">93%</div>
+          <div style="font-size:11px;color:#6E7681;margin-top:4px">Fixable with SQL</div>
+        </div>
+        <div style="background:#0D1117;border-radius:8px;padding:14px;text-align:center">
+          <div style="font-size:22px;font-weight:900;color:#58A6FF;font-family:'JetBrains Mono',monospace">2w</div>
+          <div style="font-size:11px;color:#6E7681;margin-top:4px">Est. to clean</div>
+        </div>
+      </div>
+    </div>"""
+
+# What the unlocked plan contains — the first pill is highlighted
+_LOCK_PILLS = (
+    ("💻", "SQL fix queries"), ("🔍", "Root cause analysis"), ("⏱", "Effort estimates"),
+    ("🛡", "Prevention strategies"), ("📊", "Priority ranking"),
+)
+_LOCK_PILLS_HTML = "".join(
+    f'<span class="lock-pill{" hot" if i == 0 else ""}">{icon} {text}</span>'
+    for i, (icon, text) in enumerate(_LOCK_PILLS)
+)
+
+# Blurred preview + lock overlay; filled with .format(cards, flair, pills, n_fixes, n_critical, n_high)
+_LOCKED_CTA_HTML = """
+    <div style="position:relative;margin:32px 0 0;border-radius:12px;overflow:hidden">
+      <!-- BLURRED REAL CONTENT -->
+      <div style="filter:blur(5px);pointer-events:none;user-select:none;
+                  opacity:0.75;max-height:820px;overflow:hidden">
+        {cards}
+        {flair}
+      </div>
+
+      <!-- GRADIENT FADE (bottom) -->
+      <div style="position:absolute;bottom:0;left:0;right:0;height:420px;
+                  background:linear-gradient(180deg,transparent 0%,#0D1117 52%);
+                  pointer-events:none"></div>
+
+      <!-- LOCK OVERLAY -->
+      <div style="position:absolute;bottom:0;left:0;right:0;
+                  display:flex;flex-direction:column;align-items:center;
+                  padding:40px 24px 36px;text-align:center">
+
+        <div style="width:64px;height:64px;
+                    background:linear-gradient(135deg,#F85149,#F0883E);
+                    border-radius:50%;display:flex;align-items:center;
+                    justify-content:center;font-size:28px;margin-bottom:20px;
+                    box-shadow:0 0 40px rgba(248,81,73,0.35)">🔒</div>
+
+        <div style="font-size:26px;font-weight:900;color:#E6EDF3;
+                    margin-bottom:10px;letter-spacing:-0.5px">
+          Your Full Remediation Plan is Ready
+        </div>
+        <div style="font-size:14px;color:#8B949E;max-width:540px;
+                    line-height:1.8;margin-bottom:24px">
+          <strong style="color:#C9D1D9">{n_fixes} fixes identified</strong> —
+          {n_critical} critical &nbsp;·&nbsp; {n_high} high priority.<br>
+          Root cause · SQL queries · Step-by-step guides · Effort estimates · Prevention.
+        </div>
+
+        <div style="display:flex;justify-content:center;flex-wrap:wrap;gap:8px;margin-bottom:28px">
+          {pills}
+        </div>
+
+      </div>
+    </div>"""
+
+_LEAD_PITCH_HTML = """
+    <div style="background:#161B22;border:1px solid #30363D;border-radius:16px;
+                padding:32px 36px;margin-top:28px;animation:scaleIn 0.4s ease both">
+      <div style="display:flex;align-items:flex-start;gap:28px;flex-wrap:wrap">
+
+        <!-- Left: value prop -->
+        <div style="flex:1;min-width:240px">
+          <div style="font-size:10px;font-weight:700;text-transform:uppercase;
+                      letter-spacing:2px;color:#F85149;margin-bottom:10px">
+            🔓 Unlock Your Full Report
+          </div>
+          <div style="font-size:20px;font-weight:800;color:#E6EDF3;
+                      line-height:1.3;margin-bottom:12px">
+            Get the step-by-step plan to fix every issue we found
+          </div>
+          <div style="font-size:13px;color:#8B949E;line-height:1.7;margin-bottom:20px">
+            Your report includes SQL fix queries, root cause analysis,
+            and prevention rules — ready to hand off to your team.
+          </div>
+          <div style="display:flex;flex-direction:column;gap:8px">
+            <div style="font-size:12px;color:#6E7681;display:flex;align-items:center;gap:8px">
+              <span style="color:#3FB950;font-size:14px">✓</span> SQL fix queries for each issue
+            </div>
+            <div style="font-size:12px;color:#6E7681;display:flex;align-items:center;gap:8px">
+              <span style="color:#3FB950;font-size:14px">✓</span> Root cause + prevention rules
+            </div>
+            <div style="font-size:12px;color:#6E7681;display:flex;align-items:center;gap:8px">
+              <span style="color:#3FB950;font-size:14px">✓</span> Effort estimates & priority ranking
+            </div>
+            <div style="font-size:12px;color:#6E7681;display:flex;align-items:center;gap:8px">
+              <span style="color:#3FB950;font-size:14px">✓</span> Free · No credit card required
+            </div>
+          </div>
+          <!-- Testimonial -->
+          <div style="background:#0D1117;border:1px solid #21262D;border-radius:10px;
+                      padding:16px 18px;margin-top:20px">
+            <div style="font-size:13px;color:#C9D1D9;line-height:1.6;font-style:italic;margin-bottom:10px">
+              "Found $47k in orphaned orders we didn't even know existed.
+              Fixed in a day using the SQL queries provided."
+            </div>
+            <div style="font-size:11px;font-weight:700;color:#58A6FF">
+              — Head of Analytics, SaaS company
+            </div>
+          </div>
+        </div>
+
+        <!-- Right: social proof number -->
+        <div style="text-align:center;min-width:120px;padding-top:8px">
+          <div style="font-size:36px;font-weight:900;color:#E6EDF3;
+                      font-family:'JetBrains Mono',monospace;line-height:1">3,400+</div>
+          <div style="font-size:11px;color:#6E7681;margin-top:4px">teams unlocked<br>their report this month</div>
+        </div>
+
+      </div>
+    </div>
+    """
+
+
+def _locked_rec_card_html(rec: dict) -> str:
+    """Full recommendation card shown (blurred) behind the remediation lock."""
+    s = rec["_sev_style"]
+    e = rec["_esc"]
+    steps_html = "".join(
+        f"<li style='margin-bottom:8px;color:#C9D1D9'>{step}</li>"
+        for step in e["full_steps"]
+    )
+    return f"""
+        <div style="background:{s['bg']};border:1px solid {s['border']};
+                    border-left:4px solid {s['border']};border-radius:10px;
+                    padding:20px;margin-bottom:14px">
+          <div style="display:flex;align-items:center;gap:12px;margin-bottom:14px">
+            <span style="font-size:22px">{rec['icon']}</span>
+            <span style="font-size:15px;font-weight:700;color:#E6EDF3">{e['title']}</span>
+            <span style="background:{s['badge_bg']};color:{s['badge_fg']};font-size:10px;
+                         font-weight:700;padding:2px 10px;border-radius:999px;
+                         text-transform:uppercase;margin-left:auto">
+              {rec.get('severity','medium').upper()}
+            </span>
+          </div>
+          <p style="font-size:13px;color:#8B949E;margin:0 0 14px;line-height:1.6">
+            <strong style="color:#C9D1D9">Root cause:</strong> {e.get('full_root_cause','')}
+          </p>
+          <p style="font-size:12px;font-weight:700;color:{s['text']};
+                    text-transform:uppercase;letter-spacing:1px;margin:0 0 8px">
+            Step-by-step fix
+          </p>
+          <ol style="font-size:13px;margin:0 0 16px;padding-left:18px;line-height:1.8">
+            {steps_html}
+          </ol>
+          <div style="display:flex;flex-wrap:wrap;gap:20px;font-size:12px;color:#6E7681;
+                      border-top:1px solid #21262D;padding-top:12px">
+            <span>⏱ <strong style="color:#8B949E">Effort:</strong> {e.get('effort','')}</span>
+            <span>🛡 <strong style="color:#8B949E">Prevention:</strong> {e.get('prevention','')}</span>
+          </div>
+        </div>"""
+
+
+@st.fragment
+def _render_remediation_gate(R: dict, simple: bool):
+    """Unlocked plan, or teasers + blurred preview + lead form.
+    Runs as a fragment so submitting the form only reruns this section;
+    the submit handler updates state before that rerun."""
+    # UNLOCKED
+    if st.session_state.get("email_submitted"):
+        uname = st.session_state.get("user_info", {}).get("name", "")
+        fname = _esc(uname.split()[0]) if uname else "there"
+        st.markdown(f"""
+        <div style="background:linear-gradient(135deg,#0A160A,#0D1F0D);
+                    border:1px solid #238636;border-radius:14px;
+                    padding:20px 28px;margin-bottom:20px;
+                    display:flex;align-items:center;gap:16px;animation:fadeUp 0.4s ease both">
+          <div style="font-size:32px">🎉</div>
+          <div>
+            <div style="font-size:16px;font-weight:800;color:#3FB950;margin-bottom:2px">
+              Report unlocked, {fname}!
+            </div>
+            <div style="font-size:13px;color:#6E7681">
+              Your full remediation plan is below — prioritized by severity.
+              Check your inbox for a copy.
+            </div>
+          </div>
+        </div>
+        """, unsafe_allow_html=True)
+        st.markdown(R["rec_html"], unsafe_allow_html=True)
+        return
+
+    # TEASER
+    teaser_intro = (
+        'Here\'s a preview of what we found. Enter your details below to get the full step-by-step fix guide.'
+        if simple else
+        'A preview of your top issues. Enter your details below to unlock the full step-by-step guide.'
+    )
+    # Intro + top-3 teasers go out as one markdown element
+    st.markdown(
+        f'\n    <p style="font-size:14px;color:#8B949E;margin-bottom:18px">{teaser_intro}</p>'
+        + R["rec_gate_html"]["teasers"],
+        unsafe_allow_html=True)
+
+    # ── BLURRED DASHBOARD PREVIEW + LOCK OVERLAY ──────────────────────────────
+    # Real rec cards for the blurred preview (locked recs = more convincing)
+    # and the severity counts are built once per analysis in run_analysis
+    gate = R["rec_gate_html"]
+
+    # Lock overlay and the lead pitch card below it go out as one element
+    st.markdown(_LOCKED_CTA_HTML.format(
+        cards=gate["locked"], flair=_LOCKED_FLAIR_HTML, pills=_LOCK_PILLS_HTML,
+        **gate["counts"],
+    ) + _LEAD_PITCH_HTML, unsafe_allow_html=True)
+
+    # ── INLINE LEAD FORM (no extra click required) ────────────────────────────
+
+    st.markdown("<div style='height:4px'></div>", unsafe_allow_html=True)
+
+    with st.form("lead_capture", clear_on_submit=False):
+        with st.container(border=True):
+            st.markdown("**Where should we send your report?**")
+            st.caption("No spam. No credit card. Unsubscribe anytime with one click.")
+        c1, c2 = st.columns(2)
+        with c1:
+            st.text_input("Full Name *",    placeholder="Jane Smith", key="lead_name")
+            st.text_input("Company *",      placeholder="Acme Corp",  key="lead_company")
+        with c2:
+            st.text_input("Work Email *",   placeholder="jane@company.com", key="lead_email")
+            st.selectbox("Your Role *", _ROLE_OPTIONS, key="lead_role")
+        st.checkbox(
+            "I agree to receive my full data quality report and occasional data insights. Unsubscribe anytime.",
+            key="lead_consent")
+        st.form_submit_button(
+            "📊  Send My Full Report — Free →", type="primary", use_container_width=True,
+            on_click=_submit_lead_capture)
+
+        _show_errors(st.session_state.pop("lead_errors", []))
+
+    st.markdown("""
+    <div style="text-align:center;margin-top:12px;font-size:11px;color:#484F58">
+      🔒 Your data is processed locally and never stored on our servers
+    </div>
+    """, unsafe_allow_html=True)
+
+
+@st.fragment
+def _render_simple_lead_form():
+    """Compact simple-mode email gate. A fragment, so a rejected submit only
+    reruns the form; a successful one reruns the app to reveal the report."""
+    with st.form("lead_simple", clear_on_submit=False):
+        c1, c2, c3 = st.columns([2, 2, 1])
+        with c1:
+            name  = st.text_input("Your name", placeholder="Jane Smith")
+        with c2:
+            email = st.text_input("Work email", placeholder="jane@company.com")
+        with c3:
+            st.markdown("<div style='height:28px'></div>", unsafe_allow_html=True)
+            submitted = st.form_submit_button(
+                "See My Full Report →", type="primary", use_container_width=True)
+
+        st.markdown(
+            '<div style="font-size:11px;color:#484F58;margin-top:4px">'
+            '🔒 No spam · No credit card · Unsubscribe anytime</div>',
+            unsafe_allow_html=True)
+
+        if submitted:
+            name, email = name.strip(), email.strip()
+            errs = []
+            if not name:
+                errs.append("Please enter your name.")
+            if not _EMAIL_RE.match(email):
+                errs.append("Please enter a valid email address.")
+            if errs:
+                _show_errors(errs)
+            else:
+                _queue_lead(name, "", email, "")
+                st.session_state.user_info = {
+                    "name": name, "email": email,
+                    "company": "", "role": ""}
+                st.session_state.email_submitted = True
+                st.rerun()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Main app
+# ─────────────────────────────────────────────────────────────────────────────
+
+def main():
 
     # ── MODE ──────────────────────────────────────────────────────────────────
     if "mode" not in st.session_state:
         st.session_state["mode"] = "simple"
     simple = st.session_state["mode"] == "simple"
 
-    # ── HERO ─────────────────────────────────────────────────────────────────
+    # ── HERO (carries the first Data Source label in the same markdown call) ──
     if simple:
         st.markdown("""
     <div class="hero">
@@ -2805,6 +3476,7 @@ def main():
         <span class="trust-pill">🆓 100% free · no account needed</span>
       </div>
     </div>
+    <div class="upload-label">Step 1 — Upload your file</div>
     """, unsafe_allow_html=True)
     else:
         st.markdown("""
@@ -2835,13 +3507,13 @@ def main():
         </div>
       </div>
     </div>
+    <div class="section-header" style="margin-bottom:6px">Data Source</div>
     """, unsafe_allow_html=True)
 
     # ── DATA SOURCE ───────────────────────────────────────────────────────────
     uploaded_files = []
 
     if simple:
-        st.markdown('<div class="upload-label">Step 1 — Upload your file</div>', unsafe_allow_html=True)
         up_col, info_col = st.columns([3, 1], gap="medium")
         with up_col:
             uploaded_files = st.file_uploader(
@@ -2872,9 +3544,6 @@ def main():
             </div>
             """, unsafe_allow_html=True)
     else:
-        st.markdown("""
-        <div class="section-header" style="margin-bottom:6px">Data Source</div>
-        """, unsafe_allow_html=True)
         tab_files, tab_db = st.tabs(["📁  Upload CSV Files", "🔌  Connect to Database"])
         with tab_files:
             up_col, info_col = st.columns([3, 1], gap="medium")
@@ -2949,7 +3618,7 @@ def main():
     preview_dfs = {}
     for f in uploaded_files:
         try:
-            fname = re.sub(r"\.csv$", "", f.name, flags=re.IGNORECASE)
+            fname = _CSV_EXT_RE.sub("", f.name)
             preview_dfs[fname] = pd.read_csv(f, nrows=0)
             f.seek(0)
         except Exception:
@@ -2971,28 +3640,13 @@ def main():
         for k in ["results","email_submitted","show_form","user_info"]:
             st.session_state.pop(k, None)
 
-        analysis_steps = [
-            ("📂", "Loading and normalizing files"),
-            ("🧠", "Detecting entities and business domain"),
-            ("🗺️", "Mapping cross-file relationships"),
-            ("⚡", "Running 23 quality checks"),
-            ("💥", "Calculating business impact"),
-        ]
+        # Shown only while the real work runs — no scripted delays
         prog = st.empty()
-        done = []
-        for i, (emoji, label) in enumerate(analysis_steps):
-            pct = int((i / len(analysis_steps)) * 88) + 5
-            _render_progress(prog, pct, f"{emoji} {label}...", done)
-            time.sleep(0.6)
-            done.append((emoji, label))
-
+        _render_progress(prog, 5, "⚡ Running 23 quality checks...", [])
         results, errors = run_analysis(uploaded_files, cfg=assessment_cfg)
-        _render_progress(prog, 100, "✅ Diagnostic complete", done)
-        time.sleep(0.4)
         prog.empty()
 
-        for e in errors:
-            st.error(e)
+        _show_errors(errors)
         if results:
             st.session_state.results = results
             st.session_state["assessment"] = assessment_cfg
@@ -3013,14 +3667,10 @@ def main():
             # ── COMPACT EMAIL GATE — shown right after score ───────────────────
             overall  = R["score_data"]["scores"]["overall"]
             grade, gc = overall_grade(overall)
-            n_issues = (
-                len(R["orphans"].get("findings", [])) +
-                len(R["dupes"].get("findings", [])) +
-                len(R["gaps"].get("findings", []))
-            )
-            n_crit = sum(1 for r in recs if r.get("severity") == "critical")
+            n_issues = sum(R["issue_totals"])
+            n_crit   = R["rec_gate_html"]["counts"]["n_critical"]
             issues_txt = (
-                f"{n_issues} issue{'s' if n_issues != 1 else ''} found"
+                f"{n_issues:,} issue{'s' if n_issues != 1 else ''} found"
                 + (f" · {n_crit} critical" if n_crit else "")
             ) if n_issues else "Your data is in good shape"
 
@@ -3062,42 +3712,12 @@ def main():
             </div>
             """, unsafe_allow_html=True)
 
-            with st.form("lead_simple", clear_on_submit=False):
-                c1, c2, c3 = st.columns([2, 2, 1])
-                with c1:
-                    name  = st.text_input("Your name", placeholder="Jane Smith")
-                with c2:
-                    email = st.text_input("Work email", placeholder="jane@company.com")
-                with c3:
-                    st.markdown("<div style='height:28px'></div>", unsafe_allow_html=True)
-                    submitted = st.form_submit_button(
-                        "See My Full Report →", type="primary", use_container_width=True)
-
-                st.markdown(
-                    '<div style="font-size:11px;color:#484F58;margin-top:4px">'
-                    '🔒 No spam · No credit card · Unsubscribe anytime</div>',
-                    unsafe_allow_html=True)
-
-                if submitted:
-                    errs = []
-                    if not name.strip():
-                        errs.append("Please enter your name.")
-                    if not email.strip() or "@" not in email:
-                        errs.append("Please enter a valid email address.")
-                    if errs:
-                        for e in errs: st.error(e)
-                    else:
-                        save_lead(name.strip(), "", email.strip(), "")
-                        st.session_state.user_info = {
-                            "name": name.strip(), "email": email.strip(),
-                            "company": "", "role": ""}
-                        st.session_state.email_submitted = True
-                        st.rerun()
+            _render_simple_lead_form()
             return
 
         # ── Email already submitted — show detail panel ────────────────────────
         uname = st.session_state.get("user_info", {}).get("name", "")
-        fname = uname.split()[0] if uname else "there"
+        fname = _esc(uname.split()[0]) if uname else "there"
         st.markdown(f"""
         <div style="background:linear-gradient(135deg,#0A160A,#0D1F0D);
                     border:1px solid #238636;border-radius:14px;
@@ -3125,24 +3745,29 @@ def main():
         render_executive_summary(R)
         render_missing_file_suggestions(R["dfs"], R["domain"])
 
-        # Export button
-        html_report = generate_html_report(R)
+        # Export button — the report is only rendered when the user clicks
         _, dl_col, _ = st.columns([3, 2, 3])
         with dl_col:
             st.download_button(
                 label="⬇ Download Full Report (HTML)",
-                data=html_report,
+                data=lambda: _html_report_once(R),
                 file_name=f"data_quality_report_{datetime.now().strftime('%Y%m%d_%H%M')}.html",
                 mime="text/html",
                 use_container_width=True,
             )
 
-        render_data_preview(R["dfs"], R["joins"])
-        render_distributions(R["dfs"])
+        render_data_preview(R["dfs"], R["joins"], R["col_kinds"])
+        render_distributions(R["dfs"], R["col_kinds"])
+
+        orphan_findings = R["top_orphans"]
+        dupe_findings   = R["top_dupes"]
+        gap_findings    = R["top_gaps"]
+        multi_file        = len(R["dfs"]) > 1
+        has_relationships = multi_file and bool(R["joins"] or orphan_findings or gap_findings)
 
-        if len(R["dfs"]) > 1:
-            st.markdown('<hr class="dq-divider">', unsafe_allow_html=True)
+        if multi_file:
             st.markdown("""
+            <hr class="dq-divider">
             <div class="section-header">Per-File Breakdown</div>
             <div class="section-title">Quality Score Heatmap</div>
             <div class="section-sub">
@@ -3150,141 +3775,67 @@ def main():
               Each cell is independently calculated for that specific file.
             </div>
             """, unsafe_allow_html=True)
-            render_quality_heatmap(R["dfs"], R["score_data"])
+            render_quality_heatmap(R["dfs"], R["score_data"], R["col_kinds"])
 
-        if len(R["dfs"]) > 1:
-            st.markdown('<hr class="dq-divider">', unsafe_allow_html=True)
             st.markdown("""
+            <hr class="dq-divider">
             <div class="section-header">Relationship Analysis</div>
             <div class="section-title">Your Data Pipeline Map</div>
             <div class="section-sub">
               Green lines = healthy joins · Red/orange lines = broken connections with orphan counts
             </div>
+            <div class="flow-section">
             """, unsafe_allow_html=True)
-            st.markdown('<div class="flow-section">', unsafe_allow_html=True)
-            flow_fig = make_flow_map(R["dfs"], R["joins"], R["orphans"], R["gaps"])
+            flow_fig = _flow_map_once(R)
             st.plotly_chart(flow_fig, use_container_width=True, config={"displayModeBar": False})
             _dl_png_btn(flow_fig, "data_pipeline_map.png", "⬇ Download Pipeline Map")
             st.markdown('</div>', unsafe_allow_html=True)
 
         if R["narrative"]:
-            st.markdown('<hr class="dq-divider">', unsafe_allow_html=True)
             st.markdown("""
+            <hr class="dq-divider">
             <div class="section-header">Semantic Analysis</div>
             <div class="section-title">What Your Data Is Telling Us</div>
             <div class="section-sub">
               Beyond format checks — a contextual interpretation of what we found.
             </div>
-            """, unsafe_allow_html=True)
-            for n in R["narrative"]:
-                render_insight(n["icon"], n["title"], n["text"])
+            """ + R["narrative_html"],
+                unsafe_allow_html=True)
 
         impact = R["impact"]
         if impact.get("items"):
-            st.markdown('<hr class="dq-divider">', unsafe_allow_html=True)
             st.markdown("""
+            <hr class="dq-divider">
             <div class="section-header">Business Impact</div>
             <div class="section-title">Estimated Cost of Data Issues</div>
-            """, unsafe_allow_html=True)
-            if impact.get("has_monetary") and impact.get("total"):
-                total = impact["total"]
-                rows_html = ""
-                for item in impact["items"]:
-                    if item.get("value"):
-                        rows_html += f"""
-                        <div class="impact-row">
-                          <span style="color:#8B949E">{item['label']}</span>
-                          <span style="color:#F85149;font-weight:700;font-family:'JetBrains Mono',monospace">
-                            ~${item['value']:,.0f}
-                          </span>
-                        </div>"""
-                st.markdown(f"""
-                <div class="impact-box">
-                  <div style="font-size:12px;font-weight:700;text-transform:uppercase;letter-spacing:1px;color:#6E7681;margin-bottom:6px">
-                    Identified risk
-                  </div>
-                  <div class="impact-total">~${total:,.0f}</div>
-                  <div style="font-size:12px;color:#6E7681;margin-bottom:20px">
-                    estimated revenue / pipeline at risk · based on avg transaction value ${impact['avg_value']:,.0f}
-                  </div>
-                  {rows_html}
-                </div>""", unsafe_allow_html=True)
-            else:
-                items_html = "".join(
-                    f'<div class="impact-row"><span style="color:#8B949E">{i["label"]}</span>'
-                    f'<span style="color:#F85149;font-weight:700">{i["count"]:,} records</span></div>'
-                    for i in impact["items"]
-                )
-                st.markdown(f"""
-                <div class="impact-box">
-                  <div style="font-size:12px;font-weight:700;text-transform:uppercase;letter-spacing:1px;color:#6E7681;margin-bottom:16px">
-                    Records at risk (no monetary column detected for $ estimate)
-                  </div>
-                  {items_html}
-                </div>""", unsafe_allow_html=True)
-
-        st.markdown('<hr class="dq-divider">', unsafe_allow_html=True)
-        st.markdown("""
-        <div class="section-header">Critical Findings</div>
-        <div class="section-title">What's Broken — and Why It Matters</div>
-        <div class="section-sub">
-          Issues found by analyzing <em>relationships between files</em>.
-          Data that looks clean in isolation often breaks at the joins.
-        </div>
-        """, unsafe_allow_html=True)
-
-        shown = 0
-        for f in R["orphans"].get("findings", [])[:2]:
-            pct = f["pct_of_source"]
-            sev = "critical" if pct > 25 else ("high" if pct > 8 else "medium")
-            render_finding(
-                title=f"Orphan records — {f['direction']}",
-                metric=f"{f['orphan_count']:,} records ({pct}%) invisible in reports",
-                severity=sev,
-                detail=f"Key: <code style='color:#79C0FF;font-family:JetBrains Mono'>{f['key']}</code> · "
-                       "These records vanish from every JOIN, aggregation, and report built on this relationship.",
-                examples=f["example_values"],
-            )
-            shown += 1
-
-        for f in R["dupes"].get("findings", [])[:1]:
-            sev = "critical" if f["duplicate_count"] > 10 else "high"
-            names_ex = [e.get("name") or e.get("value_a","") for e in f["examples"][:3]]
-            render_finding(
-                title=f"Entity duplicates — '{f['file']}' ({f['type']})",
-                metric=f"{f['duplicate_count']} duplicate entities",
-                severity=sev,
-                detail="Same real-world entity under multiple IDs. "
-                       "Every count, segment, and KPI built on this table is wrong.",
-                examples=names_ex,
-            )
-            shown += 1
-
-        for f in R["gaps"].get("findings", [])[:1]:
-            pct = f["pct_of_upstream"]
-            sev = "critical" if pct > 20 else ("high" if pct > 5 else "medium")
-            render_finding(
-                title=f"Process gap — {f['stage_from']} → {f['stage_to']}",
-                metric=f"{f['missing_count']:,} records ({pct}%) stalled in the pipeline",
-                severity=sev,
-                detail="Records started the process but never completed the next stage. "
-                       "SLA violations, broken audit trail, and invisible workflow failures.",
-                examples=f["example_ids"],
-            )
-            shown += 1
+            """ + _impact_box_html(impact), unsafe_allow_html=True)
+
+        # No cross-file relationships and no duplicates — skip the whole section
+        if has_relationships or dupe_findings:
+            findings_header = """
+            <hr class="dq-divider">
+            <div class="section-header">Critical Findings</div>
+            <div class="section-title">What's Broken — and Why It Matters</div>
+            <div class="section-sub">
+              Issues found by analyzing <em>relationships between files</em>.
+              Data that looks clean in isolation often breaks at the joins.
+            </div>
+            """
 
-        if shown == 0:
-            st.success("✅ No critical integration issues detected across the uploaded files.")
+            st.markdown(findings_header + R["findings_html"], unsafe_allow_html=True)
+            if not R["findings_html"]:
+                st.success("✅ No critical integration issues detected across the uploaded files.")
 
     # ── RECOMMENDATIONS (both modes) ──────────────────────────────────────────
-    st.markdown('<hr class="dq-divider">', unsafe_allow_html=True)
     if simple:
         st.markdown("""
+        <hr class="dq-divider">
         <div class="section-header">Next Steps</div>
         <div class="section-title">How to Fix It</div>
         """, unsafe_allow_html=True)
     else:
         st.markdown("""
+        <hr class="dq-divider">
         <div class="section-header">Remediation Plan</div>
         <div class="section-title">How to Fix It</div>
         """, unsafe_allow_html=True)
@@ -3293,302 +3844,10 @@ def main():
         st.success("No specific recommendations — data quality is solid.")
         return
 
-    # UNLOCKED
+    _render_remediation_gate(R, simple)
     if st.session_state.get("email_submitted"):
-        uname = st.session_state.get("user_info", {}).get("name", "")
-        fname = uname.split()[0] if uname else "there"
-        st.markdown(f"""
-        <div style="background:linear-gradient(135deg,#0A160A,#0D1F0D);
-                    border:1px solid #238636;border-radius:14px;
-                    padding:20px 28px;margin-bottom:20px;
-                    display:flex;align-items:center;gap:16px;animation:fadeUp 0.4s ease both">
-          <div style="font-size:32px">🎉</div>
-          <div>
-            <div style="font-size:16px;font-weight:800;color:#3FB950;margin-bottom:2px">
-              Report unlocked, {fname}!
-            </div>
-            <div style="font-size:13px;color:#6E7681">
-              Your full remediation plan is below — prioritized by severity.
-              Check your inbox for a copy.
-            </div>
-          </div>
-        </div>
-        """, unsafe_allow_html=True)
-        for rec in recs:
-            render_rec_full(rec)
         return
 
-    # TEASER
-    teaser_intro = (
-        'Here\'s a preview of what we found. Enter your details below to get the full step-by-step fix guide.'
-        if simple else
-        'A preview of your top issues. Enter your details below to unlock the full step-by-step guide.'
-    )
-    st.markdown(
-        f'<p style="font-size:14px;color:#8B949E;margin-bottom:18px">{teaser_intro}</p>',
-        unsafe_allow_html=True)
-
-    for rec in recs[:3]:
-        render_rec_teaser(rec)
-
-    # ── BLURRED DASHBOARD PREVIEW + LOCK OVERLAY ──────────────────────────────
-    # Build real rec cards for the blurred preview (locked recs = more convincing)
-    locked_recs = recs[3:] if len(recs) > 3 else recs[1:] if len(recs) > 1 else recs
-    blurred_cards_html = ""
-    for rec in locked_recs[:4]:
-        s = SEV.get(rec.get("severity", "medium"), SEV["medium"])
-        steps_html = "".join(
-            f"<li style='margin-bottom:8px;color:#C9D1D9'>{step}</li>"
-            for step in rec.get("full_steps", [])
-        )
-        blurred_cards_html += f"""
-        <div style="background:{s['bg']};border:1px solid {s['border']};
-                    border-left:4px solid {s['border']};border-radius:10px;
-                    padding:20px;margin-bottom:14px">
-          <div style="display:flex;align-items:center;gap:12px;margin-bottom:14px">
-            <span style="font-size:22px">{rec['icon']}</span>
-            <span style="font-size:15px;font-weight:700;color:#E6EDF3">{rec['title']}</span>
-            <span style="background:{s['badge_bg']};color:{s['badge_fg']};font-size:10px;
-                         font-weight:700;padding:2px 10px;border-radius:999px;
-                         text-transform:uppercase;margin-left:auto">
-              {rec.get('severity','medium').upper()}
-            </span>
-          </div>
-          <p style="font-size:13px;color:#8B949E;margin:0 0 14px;line-height:1.6">
-            <strong style="color:#C9D1D9">Root cause:</strong> {rec.get('full_root_cause','')}
-          </p>
-          <p style="font-size:12px;font-weight:700;color:{s['text']};
-                    text-transform:uppercase;letter-spacing:1px;margin:0 0 8px">
-            Step-by-step fix
-          </p>
-          <ol style="font-size:13px;margin:0 0 16px;padding-left:18px;line-height:1.8">
-            {steps_html}
-          </ol>
-          <div style="display:flex;flex-wrap:wrap;gap:20px;font-size:12px;color:#6E7681;
-                      border-top:1px solid #21262D;padding-top:12px">
-            <span>⏱ <strong style="color:#8B949E">Effort:</strong> {rec.get('effort','')}</span>
-            <span>🛡 <strong style="color:#8B949E">Prevention:</strong> {rec.get('prevention','')}</span>
-          </div>
-        </div>"""
-
-    # Fake SQL block adds visual richness
-    sql_flair = """
-    <div style="background:#0D1117;border:1px solid #30363D;border-radius:10px;
-                padding:20px;margin-bottom:14px">
-      <div style="font-size:11px;font-weight:700;color:#6E7681;text-transform:uppercase;
-                  letter-spacing:1px;margin-bottom:12px">💻 SQL Fix Queries</div>
-      <pre style="background:#010409;border:1px solid #21262D;border-radius:6px;
-                  padding:16px;font-size:12px;color:#79C0FF;
-                  font-family:'JetBrains Mono',monospace;overflow-x:auto;margin:0">UPDATE orders o
-LEFT JOIN customers c ON o.customer_id = c.id
-SET o.status = 'orphaned'
-WHERE c.id IS NULL;
-
--- Deduplicate entities
-WITH ranked AS (
-  SELECT *, ROW_NUMBER() OVER (
-    PARTITION BY email ORDER BY created_at DESC
-  ) AS rn FROM customers
-)
-DELETE FROM customers WHERE rn &gt; 1;</pre>
-    </div>
-    <div style="background:#161B22;border:1px solid #21262D;border-radius:10px;
-                padding:20px;margin-bottom:14px">
-      <div style="font-size:11px;font-weight:700;color:#6E7681;text-transform:uppercase;
-                  letter-spacing:1px;margin-bottom:16px">📈 Impact & Effort Matrix</div>
-      <div style="display:grid;grid-template-columns:1fr 1fr 1fr;gap:12px">
-        <div style="background:#0D1117;border-radius:8px;padding:14px;text-align:center">
-          <div style="font-size:22px;font-weight:900;color:#F85149;font-family:'JetBrains Mono',monospace">4h</div>
-          <div style="font-size:11px;color:#6E7681;margin-top:4px">Avg fix time</div>
-        </div>
-        <div style="background:#0D1117;border-radius:8px;padding:14px;text-align:center">
-          <div style="font-size:22px;font-weight:900;color:#3FB950;font-family:'JetBrains Mono',monospace">93%</div>
-          <div style="font-size:11px;color:#6E7681;margin-top:4px">Fixable with SQL</div>
-        </div>
-        <div style="background:#0D1117;border-radius:8px;padding:14px;text-align:center">
-          <div style="font-size:22px;font-weight:900;color:#58A6FF;font-family:'JetBrains Mono',monospace">2w</div>
-          <div style="font-size:11px;color:#6E7681;margin-top:4px">Est. to clean</div>
-        </div>
-      </div>
-    </div>"""
-
-    n_fixes    = len(recs)
-    n_critical = sum(1 for r in recs if r.get("severity") == "critical")
-    n_high     = sum(1 for r in recs if r.get("severity") == "high")
-
-    st.markdown(f"""
-    <div style="position:relative;margin:32px 0 0;border-radius:12px;overflow:hidden">
-      <!-- BLURRED REAL CONTENT -->
-      <div style="filter:blur(5px);pointer-events:none;user-select:none;
-                  opacity:0.75;max-height:820px;overflow:hidden">
-        {blurred_cards_html}
-        {sql_flair}
-      </div>
-
-      <!-- GRADIENT FADE (bottom) -->
-      <div style="position:absolute;bottom:0;left:0;right:0;height:420px;
-                  background:linear-gradient(180deg,transparent 0%,#0D1117 52%);
-                  pointer-events:none"></div>
-
-      <!-- LOCK OVERLAY -->
-      <div style="position:absolute;bottom:0;left:0;right:0;
-                  display:flex;flex-direction:column;align-items:center;
-                  padding:40px 24px 36px;text-align:center">
-
-        <div style="width:64px;height:64px;
-                    background:linear-gradient(135deg,#F85149,#F0883E);
-                    border-radius:50%;display:flex;align-items:center;
-                    justify-content:center;font-size:28px;margin-bottom:20px;
-                    box-shadow:0 0 40px rgba(248,81,73,0.35)">🔒</div>
-
-        <div style="font-size:26px;font-weight:900;color:#E6EDF3;
-                    margin-bottom:10px;letter-spacing:-0.5px">
-          Your Full Remediation Plan is Ready
-        </div>
-        <div style="font-size:14px;color:#8B949E;max-width:540px;
-                    line-height:1.8;margin-bottom:24px">
-          <strong style="color:#C9D1D9">{n_fixes} fixes identified</strong> —
-          {n_critical} critical &nbsp;·&nbsp; {n_high} high priority.<br>
-          Root cause · SQL queries · Step-by-step guides · Effort estimates · Prevention.
-        </div>
-
-        <div style="display:flex;justify-content:center;flex-wrap:wrap;gap:8px;margin-bottom:28px">
-          <span style="background:#1C1000;border:1px solid #F85149;border-radius:999px;
-                       padding:5px 16px;font-size:12px;color:#F85149;font-weight:700">
-            💻 SQL fix queries
-          </span>
-          <span style="background:#21262D;border:1px solid #30363D;border-radius:999px;
-                       padding:5px 16px;font-size:12px;color:#8B949E">
-            🔍 Root cause analysis
-          </span>
-          <span style="background:#21262D;border:1px solid #30363D;border-radius:999px;
-                       padding:5px 16px;font-size:12px;color:#8B949E">
-            ⏱ Effort estimates
-          </span>
-          <span style="background:#21262D;border:1px solid #30363D;border-radius:999px;
-                       padding:5px 16px;font-size:12px;color:#8B949E">
-            🛡 Prevention strategies
-          </span>
-          <span style="background:#21262D;border:1px solid #30363D;border-radius:999px;
-                       padding:5px 16px;font-size:12px;color:#8B949E">
-            📊 Priority ranking
-          </span>
-        </div>
-
-      </div>
-    </div>""", unsafe_allow_html=True)
-
-    # ── INLINE LEAD FORM (no extra click required) ────────────────────────────
-    st.markdown(f"""
-    <div style="background:#161B22;border:1px solid #30363D;border-radius:16px;
-                padding:32px 36px;margin-top:12px;animation:scaleIn 0.4s ease both">
-      <div style="display:flex;align-items:flex-start;gap:28px;flex-wrap:wrap">
-
-        <!-- Left: value prop -->
-        <div style="flex:1;min-width:240px">
-          <div style="font-size:10px;font-weight:700;text-transform:uppercase;
-                      letter-spacing:2px;color:#F85149;margin-bottom:10px">
-            🔓 Unlock Your Full Report
-          </div>
-          <div style="font-size:20px;font-weight:800;color:#E6EDF3;
-                      line-height:1.3;margin-bottom:12px">
-            Get the step-by-step plan to fix every issue we found
-          </div>
-          <div style="font-size:13px;color:#8B949E;line-height:1.7;margin-bottom:20px">
-            Your report includes SQL fix queries, root cause analysis,
-            and prevention rules — ready to hand off to your team.
-          </div>
-          <div style="display:flex;flex-direction:column;gap:8px">
-            <div style="font-size:12px;color:#6E7681;display:flex;align-items:center;gap:8px">
-              <span style="color:#3FB950;font-size:14px">✓</span> SQL fix queries for each issue
-            </div>
-            <div style="font-size:12px;color:#6E7681;display:flex;align-items:center;gap:8px">
-              <span style="color:#3FB950;font-size:14px">✓</span> Root cause + prevention rules
-            </div>
-            <div style="font-size:12px;color:#6E7681;display:flex;align-items:center;gap:8px">
-              <span style="color:#3FB950;font-size:14px">✓</span> Effort estimates & priority ranking
-            </div>
-            <div style="font-size:12px;color:#6E7681;display:flex;align-items:center;gap:8px">
-              <span style="color:#3FB950;font-size:14px">✓</span> Free · No credit card required
-            </div>
-          </div>
-          <!-- Testimonial -->
-          <div style="background:#0D1117;border:1px solid #21262D;border-radius:10px;
-                      padding:16px 18px;margin-top:20px">
-            <div style="font-size:13px;color:#C9D1D9;line-height:1.6;font-style:italic;margin-bottom:10px">
-              "Found $47k in orphaned orders we didn't even know existed.
-              Fixed in a day using the SQL queries provided."
-            </div>
-            <div style="font-size:11px;font-weight:700;color:#58A6FF">
-              — Head of Analytics, SaaS company
-            </div>
-          </div>
-        </div>
-
-        <!-- Right: social proof number -->
-        <div style="text-align:center;min-width:120px;padding-top:8px">
-          <div style="font-size:36px;font-weight:900;color:#E6EDF3;
-                      font-family:'JetBrains Mono',monospace;line-height:1">3,400+</div>
-          <div style="font-size:11px;color:#6E7681;margin-top:4px">teams unlocked<br>their report this month</div>
-        </div>
-
-      </div>
-    </div>
-    """, unsafe_allow_html=True)
-
-    st.markdown("<div style='height:4px'></div>", unsafe_allow_html=True)
-
-    with st.form("lead_capture", clear_on_submit=False):
-        st.markdown("""
-        <div style="background:#0D1117;border:1px solid #21262D;border-radius:12px;
-                    padding:24px 28px;margin-bottom:4px">
-          <div style="font-size:15px;font-weight:700;color:#E6EDF3;margin-bottom:4px">
-            Where should we send your report?
-          </div>
-          <div style="font-size:12px;color:#484F58;margin-bottom:20px">
-            No spam. No credit card. Unsubscribe anytime with one click.
-          </div>
-        </div>
-        """, unsafe_allow_html=True)
-        c1, c2 = st.columns(2)
-        with c1:
-            name    = st.text_input("Full Name *",    placeholder="Jane Smith")
-            company = st.text_input("Company *",      placeholder="Acme Corp")
-        with c2:
-            email = st.text_input("Work Email *",   placeholder="jane@company.com")
-            role  = st.selectbox("Your Role *", [
-                "Select…", "Data Engineer", "Data Analyst",
-                "Analytics / BI Manager", "Data Governance Lead",
-                "CTO / VP Engineering", "Business Owner / Manager", "Other",
-            ])
-        consent = st.checkbox(
-            "I agree to receive my full data quality report and occasional data insights. Unsubscribe anytime.")
-        submitted = st.form_submit_button(
-            "📊  Send My Full Report — Free →", type="primary", use_container_width=True)
-
-        if submitted:
-            errs = []
-            if not name.strip():   errs.append("Full Name is required.")
-            if not company.strip():errs.append("Company is required.")
-            if not email.strip() or "@" not in email: errs.append("A valid work email is required.")
-            if role == "Select…":  errs.append("Please select your role.")
-            if not consent:        errs.append("Please accept the terms to continue.")
-            if errs:
-                for e in errs: st.error(e)
-            else:
-                save_lead(name.strip(), company.strip(), email.strip(), role)
-                st.session_state.user_info      = {"name": name.strip(), "company": company.strip(),
-                                                   "email": email.strip(), "role": role}
-                st.session_state.email_submitted = True
-                st.session_state.show_form       = False
-                st.rerun()
-
-    st.markdown("""
-    <div style="text-align:center;margin-top:12px;font-size:11px;color:#484F58">
-      🔒 Your data is processed locally and never stored on our servers
-    </div>
-    """, unsafe_allow_html=True)
-
     # Expert mode access — small unobtrusive link at very bottom
     if simple:
         st.markdown("<div style='height:24px'></div>", unsafe_allow_html=True)
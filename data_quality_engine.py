@@ -13,7 +13,7 @@ import re
 import os
 import sys
 from itertools import combinations
-from difflib import SequenceMatcher
+from rapidfuzz import fuzz, process
 
 
 # ─────────────────────────────────────────────
@@ -26,8 +26,11 @@ def load_files(file_paths: list[str]) -> dict[str, pd.DataFrame]:
     for path in file_paths:
         name = os.path.basename(path).replace(".csv", "")
         try:
-            df = pd.read_csv(path)
-            df.columns = [c.strip().lower().replace(" ", "_") for c in df.columns]
+            try:   # Arrow's multithreaded reader, Arrow-backed columns
+                df = pd.read_csv(path, engine="pyarrow", dtype_backend="pyarrow")
+            except Exception:   # dialects it rejects go through the C engine
+                df = pd.read_csv(path)
+            df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_", regex=False)
             dfs[name] = df
             print(f"  [OK] {name}: {len(df):,} rows × {len(df.columns)} columns")
         except Exception as e:
@@ -70,13 +73,13 @@ def detect_join_keys(dfs: dict[str, pd.DataFrame]) -> list[dict]:
 
     # Also try fuzzy column name matching (e.g. "customer_id" ↔ "cust_id")
     all_cols = {name: list(df.columns) for name, df in dfs.items()}
+    is_id = {c: bool(ID_PATTERNS.search(c)) for cols in all_cols.values() for c in cols}
     for (fa, cols_a), (fb, cols_b) in combinations(all_cols.items(), 2):
         for ca in cols_a:
             for cb in cols_b:
-                if ca == cb:
-                    continue  # already caught above
-                ratio = SequenceMatcher(None, ca, cb).ratio()
-                if ratio > 0.82 and (ID_PATTERNS.search(ca) or ID_PATTERNS.search(cb)):
+                if ca == cb or not (is_id[ca] or is_id[cb]):
+                    continue  # exact names already caught above; need an ID-like side
+                if fuzz.ratio(ca, cb, score_cutoff=82) > 82:
                     joins.append({"key": f"{ca} ↔ {cb}", "file_a": fa, "file_b": fb,
                                   "col_a": ca, "col_b": cb})
 
@@ -87,15 +90,40 @@ def detect_join_keys(dfs: dict[str, pd.DataFrame]) -> list[dict]:
 # CHECK 1: Orphan Records
 # ─────────────────────────────────────────────
 
-def check_orphan_records(dfs: dict, joins: list[dict]) -> dict:
+def _distinct_keys(a: pd.Series, b: pd.Series) -> tuple[pd.Index, pd.Index, bool]:
+    """
+    Distinct non-null key values of two join columns, as Indexes whose
+    set operations run in pandas' C hashtable.
+    Values stay native when both sides share a non-object dtype (or are both
+    integers); otherwise both are compared as str. Returns (a, b, as_str).
+    """
+    ia, ib = pd.Index(a.dropna().unique()), pd.Index(b.dropna().unique())
+    native = (ia.dtype == ib.dtype and ia.dtype != object) or (
+        pd.api.types.is_integer_dtype(ia) and pd.api.types.is_integer_dtype(ib))
+    if native:
+        return ia, ib, False
+    return ia.astype(str).unique(), ib.astype(str).unique(), True   # 1 and "1" collapse
+
+
+def _examples(values: pd.Index, n: int = 5) -> tuple[list, list[str]]:
+    """First n values in string order (as reports list them): (native, as str)."""
+    strs  = values.astype(str).to_numpy()
+    order = np.argsort(strs, kind="stable")[:n]
+    return values[order].tolist(), strs[order].tolist()
+
+
+def check_orphan_records(dfs: dict, joins: list[dict], collect_samples: bool = False) -> dict:
     """
     For each join pair, find records in file_a whose key value
     does NOT appear in file_b (and vice versa).
+    collect_samples: attach up to 3 source rows per finding (CLI report);
+    otherwise "sample_rows" is None.
 
     Business impact: unmatched invoices, revenue with no customer,
                      orders with no shipment record, etc.
     """
     findings = []
+    str_cols = {}   # (file, col) -> column as str; joins on a shared key reuse it
 
     for join in joins:
         fa, fb = join["file_a"], join["file_b"]
@@ -105,26 +133,32 @@ def check_orphan_records(dfs: dict, joins: list[dict]) -> dict:
         if col_a not in dfs[fa].columns or col_b not in dfs[fb].columns:
             continue
 
-        vals_a = set(dfs[fa][col_a].dropna().astype(str))
-        vals_b = set(dfs[fb][col_b].dropna().astype(str))
+        vals_a, vals_b, as_str = _distinct_keys(dfs[fa][col_a], dfs[fb][col_b])
 
-        orphans_in_a = vals_a - vals_b   # in A but not in B
-        orphans_in_b = vals_b - vals_a   # in B but not in A
+        orphans_in_a = vals_a.difference(vals_b, sort=False)   # in A but not in B
+        orphans_in_b = vals_b.difference(vals_a, sort=False)   # in B but not in A
 
         for direction, orphans, source, target in [
             (f"{fa} → {fb}", orphans_in_a, fa, fb),
             (f"{fb} → {fa}", orphans_in_b, fb, fa),
         ]:
-            if not orphans:
+            if orphans.empty:
                 continue
 
             count = len(orphans)
             pct = count / len(dfs[source]) * 100
-            examples = sorted(list(orphans))[:5]
+            ex_native, examples = _examples(orphans)
 
             # Pull sample rows for context
-            col_src = col_a if source == fa else col_b
-            sample_rows = dfs[source][dfs[source][col_src].astype(str).isin(examples)].head(3)
+            sample_rows = None
+            if collect_samples:
+                col_src = col_a if source == fa else col_b
+                keys = dfs[source][col_src]
+                if as_str:
+                    if (source, col_src) not in str_cols:
+                        str_cols[(source, col_src)] = keys.astype(str)
+                    keys = str_cols[(source, col_src)]
+                sample_rows = dfs[source][keys.isin(ex_native)].head(3)
 
             findings.append({
                 "direction": direction,
@@ -132,6 +166,7 @@ def check_orphan_records(dfs: dict, joins: list[dict]) -> dict:
                 "orphan_count": count,
                 "pct_of_source": round(pct, 1),
                 "example_values": examples,
+                "example_values_str": ", ".join(examples[:3]),   # report one-liner
                 "sample_rows": sample_rows,
             })
 
@@ -184,14 +219,13 @@ def check_entity_duplicates(dfs: dict, joins: list[dict]) -> dict:
 
         if not dup_names.empty:
             top = dup_names.head(5)
-            example_detail = []
-            for _, row in top.iterrows():
-                ids = df[df[name_col] == row[name_col]][id_col].unique().tolist()
-                example_detail.append({
-                    "name": row[name_col],
-                    "appears_with_ids": ids[:6],
-                    "id_count": int(row["unique_ids"]),
-                })
+            # One pass over the rows of the top names, not one full scan per name
+            top_ids = (df[df[name_col].isin(top[name_col])]
+                       .groupby(name_col, sort=False)[id_col].unique())
+            example_detail = [
+                {"name": n, "appears_with_ids": top_ids[n].tolist()[:6], "id_count": int(c)}
+                for n, c in zip(top[name_col], top["unique_ids"])
+            ]
             findings.append({
                 "file": name,
                 "type": "Same name, multiple IDs",
@@ -204,16 +238,28 @@ def check_entity_duplicates(dfs: dict, joins: list[dict]) -> dict:
         if len(unique_names) > 5000:
             unique_names = unique_names[:5000]  # cap for performance
 
-        fuzzy_pairs = []
         names_list = sorted(unique_names)
-        for i in range(len(names_list)):
-            for j in range(i + 1, min(i + 30, len(names_list))):  # sliding window
-                a, b = names_list[i], names_list[j]
-                if abs(len(a) - len(b)) > 8:
-                    continue
-                ratio = SequenceMatcher(None, a.lower(), b.lower()).ratio()
-                if 0.85 < ratio < 1.0:
-                    fuzzy_pairs.append((a, b, round(ratio, 2)))
+        lowered = [n.lower() for n in names_list]
+        lengths = np.fromiter(map(len, lowered), dtype=np.int64, count=len(lowered))
+        # Sliding window of 30: compare each name with the next 29. Each offset d
+        # is one diagonal, scored pairwise in native code across all cores
+        # (C++ Indel similarity 0–100; below the cutoff it returns 0).
+        hits_i, hits_j, hits_s = [], [], []
+        for d in range(1, min(30, len(lowered))):
+            score = process.cpdist(lowered[:-d], lowered[d:], scorer=fuzz.ratio,
+                                   score_cutoff=85, dtype=np.float64, workers=-1)
+            close = (score > 85) & (score < 100) & (np.abs(lengths[:-d] - lengths[d:]) <= 8)
+            idx = np.flatnonzero(close)
+            hits_i.append(idx)
+            hits_j.append(idx + d)
+            hits_s.append(score[idx])
+
+        fuzzy_pairs = []
+        if hits_i:
+            i, j, sc = map(np.concatenate, (hits_i, hits_j, hits_s))
+            order = np.lexsort((j, i))   # same (i, j) order as a nested loop
+            fuzzy_pairs = [(names_list[a], names_list[b], round(float(s) / 100, 2))
+                           for a, b, s in zip(i[order], j[order], sc[order])]
 
         if fuzzy_pairs:
             findings.append({
@@ -233,10 +279,11 @@ def check_entity_duplicates(dfs: dict, joins: list[dict]) -> dict:
 # CHECK 3: Process Flow Gaps
 # ─────────────────────────────────────────────
 
-def check_process_gaps(dfs: dict, joins: list[dict]) -> dict:
+def check_process_gaps(dfs: dict, joins: list[dict], collect_samples: bool = False) -> dict:
     """
     Detect records that exist in an early-stage file but are absent
     from a later-stage file — indicating broken process flow.
+    collect_samples: as in check_orphan_records.
 
     Heuristic: if files can be ordered by name (order→invoice→payment)
     or by row-count descending, check that IDs flow forward.
@@ -283,18 +330,20 @@ def check_process_gaps(dfs: dict, joins: list[dict]) -> dict:
         if col_a not in dfs[fa].columns or col_b not in dfs[fb].columns:
             continue
 
-        ids_upstream = set(dfs[fa][col_a].dropna().astype(str))
-        ids_downstream = set(dfs[fb][col_b].dropna().astype(str))
+        ids_upstream, ids_downstream, as_str = _distinct_keys(dfs[fa][col_a], dfs[fb][col_b])
 
-        missing_downstream = ids_upstream - ids_downstream
-        if not missing_downstream:
+        missing_downstream = ids_upstream.difference(ids_downstream, sort=False)
+        if missing_downstream.empty:
             continue
 
         count = len(missing_downstream)
         pct = count / len(ids_upstream) * 100
-        examples = sorted(list(missing_downstream))[:5]
+        ex_native, examples = _examples(missing_downstream)
 
-        sample_rows = dfs[fa][dfs[fa][col_a].astype(str).isin(examples)].head(3)
+        sample_rows = None
+        if collect_samples:
+            keys = dfs[fa][col_a].astype(str) if as_str else dfs[fa][col_a]
+            sample_rows = dfs[fa][keys.isin(ex_native)].head(3)
 
         findings.append({
             "stage_from": fa,
@@ -337,7 +386,7 @@ def print_report(orphans: dict, duplicates: dict, gaps: dict):
             print(f"\n  {f['direction']}  |  key: {f['key']}")
             print(f"  Orphans: {f['orphan_count']:,}  ({f['pct_of_source']}% of source file)")
             print(f"  Example values: {f['example_values']}")
-            if not f["sample_rows"].empty:
+            if f["sample_rows"] is not None and not f["sample_rows"].empty:
                 print("  Sample rows from source:")
                 print(f["sample_rows"].to_string(index=False, max_cols=6))
 
@@ -376,7 +425,7 @@ def print_report(orphans: dict, duplicates: dict, gaps: dict):
             print(f"\n  {f['stage_from']}  →→  {f['stage_to']}  |  key: {f['key']}")
             print(f"  Missing downstream: {f['missing_count']:,}  ({f['pct_of_upstream']}% of upstream)")
             print(f"  Example IDs not found in {f['stage_to']}: {f['example_ids']}")
-            if not f["sample_rows"].empty:
+            if f["sample_rows"] is not None and not f["sample_rows"].empty:
                 print("  Sample rows from upstream that have no continuation:")
                 print(f["sample_rows"].to_string(index=False, max_cols=6))
 
@@ -404,9 +453,9 @@ def run(file_paths: list[str]):
         print("  No shared keys detected — some cross-file checks may be limited.")
 
     print("\nRunning checks...")
-    orphans    = check_orphan_records(dfs, joins)
+    orphans    = check_orphan_records(dfs, joins, collect_samples=True)
     duplicates = check_entity_duplicates(dfs, joins)
-    gaps       = check_process_gaps(dfs, joins)
+    gaps       = check_process_gaps(dfs, joins, collect_samples=True)
 
     print_report(orphans, duplicates, gaps)
 
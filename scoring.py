@@ -39,6 +39,7 @@ def calculate_scores(dfs: dict, orphan_result: dict, duplicate_result: dict,
                      gap_result: dict, num_files: int) -> dict:
     scores  = {}
     details = {}
+    now_utc = pd.Timestamp.now(tz="UTC")   # one reference time for every date check
 
     # ── 1. COMPLETENESS (cap at 92 — no real dataset is 100% complete by design) ──
     total_cells    = sum(df.size for df in dfs.values())
@@ -100,7 +101,7 @@ def calculate_scores(dfs: dict, orphan_result: dict, duplicate_result: dict,
                 try:
                     parsed    = pd.to_datetime(df[col], errors="coerce", utc=True)
                     fail_rate = parsed.isna().sum() / len(df)
-                    future    = (parsed > pd.Timestamp.now(tz="UTC")).sum()
+                    future    = (parsed > now_utc).sum()
                     score     = 100 - fail_rate * 60 - (future / len(df)) * 30
                     col_scores.append(_cap(round(score, 1)))
                     if future:
@@ -149,7 +150,6 @@ def calculate_scores(dfs: dict, orphan_result: dict, duplicate_result: dict,
     if date_series:
         all_dates = pd.concat(date_series)
         latest    = all_dates.max()
-        now_utc   = pd.Timestamp.now(tz="UTC")
         days_old  = (now_utc - latest).days
         future    = int((all_dates > now_utc).sum())
 